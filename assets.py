@@ -0,0 +1,160 @@
+# assets.py
+"""
+Keyboard images, packed into one sprite atlas.
+
+Images live in images/ next to this file. The source images are keys.png (the unlit keyboard) and
+one key_<color><shape> image per highlight color and key shape, e.g. key_green_left.png, with the
+shapes from keyboard_layout.PITCH_CLASS_FILENAMES. Build the atlas after adding or changing any of
+them:
+
+    python assets.py [source directory]
+
+which packs every source image into images/atlas.png and stores where each one went as JSON in a
+text chunk of the same PNG. At runtime AssetManager opens only that file and serves sub-rectangles
+of it. A highlight color that was not packed is made by filling a packed highlight of the same
+shape with the color, so new colors need no new images.
+"""
+import json
+import os
+import sys
+
+from PyQt6.QtCore import QRect, Qt
+from PyQt6.QtGui import QColor, QImage, QPainter, QPixmap
+
+from keyboard_layout import PITCH_CLASS_FILENAMES
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+ATLAS_FILE = "atlas.png"
+BACKGROUND = "keys.png"
+LAYOUT_KEY = "atlas-layout"  # PNG text chunk holding the sprite rectangles
+PADDING = 1  # Transparent pixels between sprites
+KEY_SHAPES = tuple(sorted(set(PITCH_CLASS_FILENAMES)))
+
+
+def highlight_name(color, shape):
+    return f"key_{color}{shape}"
+
+
+def source_images(directory):
+    """The background and every key_<color><shape> image found in a directory."""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith("key_") and name.endswith(KEY_SHAPES))
+    if os.path.exists(os.path.join(directory, BACKGROUND)):
+        names.insert(0, BACKGROUND)
+    return names
+
+
+def pack(sizes, width):
+    """
+    Shelf-pack {name: (width, height)} into rows no wider than `width`, tallest first.
+    Returns ({name: (x, y, width, height)}, total height).
+    """
+    rects = {}
+    x = y = shelf_height = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x and x + w > width:
+            x, y, shelf_height = 0, y + shelf_height + PADDING, 0
+        rects[name] = (x, y, w, h)
+        x += w + PADDING
+        shelf_height = max(shelf_height, h)
+    return rects, y + shelf_height
+
+
+def build_atlas(source_dir=ASSET_DIR, path=None):
+    """Pack the source images of a directory into an atlas PNG. Returns the sprite rectangles."""
+    images = {}
+    for name in source_images(source_dir):
+        image = QImage(os.path.join(source_dir, name))
+        if image.isNull():
+            raise ValueError(f"Could not read {name}")
+        images[name] = image
+    if not images:
+        raise ValueError(f"No key images found in {source_dir}")
+
+    width = max(image.width() for image in images.values())
+    rects, height = pack({name: (image.width(), image.height()) for name, image in images.items()}, width)
+
+    atlas = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(atlas)
+    for name, (x, y, w, h) in rects.items():
+        painter.drawImage(x, y, images[name])
+    painter.end()
+
+    atlas.setText(LAYOUT_KEY, json.dumps({"sprites": rects}))
+    if not atlas.save(path or os.path.join(source_dir, ATLAS_FILE)):
+        raise OSError(f"Could not write {path or ATLAS_FILE}")
+    return rects
+
+
+class AssetManager:
+    """Serves the keyboard background and key highlights from the atlas, each cut out once and cached."""
+
+    def __init__(self, directory=ASSET_DIR):
+        self.directory = directory
+        self.atlas = None
+        self.sprites = {}  # name -> QRect in the atlas
+        self.pixmaps = {}  # name -> QPixmap
+        self.load_atlas()
+
+    def load_atlas(self):
+        image = QImage(os.path.join(self.directory, ATLAS_FILE))
+        if image.isNull():
+            print(f"Image atlas not found in {self.directory}, loading separate images.")
+            return
+        layout = json.loads(image.text(LAYOUT_KEY) or "{}")
+        self.sprites = {name: QRect(*rect) for name, rect in layout.get("sprites", {}).items()}
+        self.atlas = QPixmap.fromImage(image)
+
+    def pixmap(self, name):
+        """Return a packed image by its source file name"""
+        pixmap = self.pixmaps.get(name)
+        if pixmap is None:
+            rect = self.sprites.get(name)
+            if rect is not None:
+                pixmap = self.atlas.copy(rect)
+            else:
+                pixmap = QPixmap(os.path.join(self.directory, name))  # Not packed yet
+            self.pixmaps[name] = pixmap
+        return pixmap
+
+    def background(self):
+        return self.pixmap(BACKGROUND)
+
+    def highlight(self, color, shape):
+        """Return the highlight image for a color and key shape, tinting a packed one if the color has no images"""
+        name = highlight_name(color, shape)
+        pixmap = self.pixmaps.get(name)
+        if pixmap is None:
+            template = self.shape_template(shape)
+            if name in self.sprites or template is None:
+                pixmap = self.pixmap(name)
+            else:
+                pixmap = self.tint(self.pixmap(template), color)
+                self.pixmaps[name] = pixmap
+        return pixmap
+
+    def shape_template(self, shape):
+        """Name of any packed highlight with the given shape, or None"""
+        for name in self.sprites:
+            if name.startswith("key_") and name.endswith(shape):
+                return name
+        return None
+
+    def tint(self, pixmap, color):
+        """The pixmap's shape, including its soft edges, filled with a flat color"""
+        tinted = QPixmap(pixmap.size())
+        tinted.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(tinted)
+        painter.drawPixmap(0, 0, pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+        painter.fillRect(tinted.rect(), QColor(color))
+        painter.end()
+        return tinted
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else ASSET_DIR
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    sprites = build_atlas(source, os.path.join(ASSET_DIR, ATLAS_FILE))
+    print(f"Packed {len(sprites)} images from {source} into {os.path.join(ASSET_DIR, ATLAS_FILE)}")
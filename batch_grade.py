@@ -0,0 +1,174 @@
+# batch_grade.py
+"""
+Grade recorded practice sessions without the GUI.
+
+Every .mid recording is replayed into an ExerciseGrader built from the theory tables for the given
+exercise spec, the same way the Practical tab grades a live keyboard (sustain pedal and
+velocity-0 note_offs included). Recordings are graded in a process pool, one file per task, and
+one result row per file is written as soon as it is ready, in input order, so output can be piped
+or tailed while a large batch runs. Nothing on this path imports Qt.
+
+    python batch_grade.py --mode Scales --item Major --variant Right --key C --key G class/*.mid
+    python batch_grade.py --mode Sevenths --item Maj7 --item 7 --variant Root --format json \\
+        --output results.jsonl --jobs 8 class/*.mid
+
+--format json writes JSON Lines: one object per recording.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import json
+import os
+import sys
+
+from grading import ExerciseGrader, build_exercises
+from held_notes import HeldNotes, iter_bits
+from midi_event_buffer import SUSTAIN_CONTROL
+from midi_replay import load_midi_events
+from theory_store import TheoryStore
+
+SUMMARY_FIELDS = ("steps", "completed", "correct", "failed", "wrong_notes", "score", "best_streak",
+                  "mean_step_time", "slowest_step_time", "duration")
+FIELDS = ("file", "notes") + SUMMARY_FIELDS + ("error",)
+
+KEYS = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B')
+SHARP_KEYS = {'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab', 'A#': 'Bb'}
+
+# Per worker process: the exercises, built once by init_worker
+_exercises = None
+
+
+def load_theory(path):
+    """Open a compiled theory store, or a trusted .pkl file of the same tables."""
+    if path.endswith(".pkl"):
+        import pickle
+
+        with open(path, "rb") as file:
+            return pickle.load(file)
+    return TheoryStore(path)
+
+
+def key_root(name):
+    """Pitch class of a key name such as 'Eb' or 'F#'."""
+    return KEYS.index(SHARP_KEYS.get(name, name))
+
+
+def build_spec_exercises(theory, mode, items, variants, keys):
+    """The exercises a recording is expected to contain, key by key in the order given."""
+    exercises = []
+    for key in keys:
+        exercises += build_exercises(theory, mode, items, variants, key_root(key))
+    return exercises
+
+
+def init_worker(theory_path, mode, items, variants, keys):
+    global _exercises
+    _exercises = build_spec_exercises(load_theory(theory_path), mode, items, variants, keys)
+
+
+def grade_events(grader, events):
+    """Feed [(seconds, message), ...] to a grader. Returns the number of notes played."""
+    held = HeldNotes()
+    played = 0
+    for timestamp, message in events:
+        if message.type == "note_on" and message.velocity:
+            held.note_on(message.note, message.velocity, timestamp)
+            grader.note_on(message.note, timestamp)
+            played += 1
+        elif message.type in ("note_on", "note_off"):
+            if held.note_off(message.note):
+                grader.note_off(message.note)
+        elif message.type == "control_change" and message.control == SUSTAIN_CONTROL:
+            for note in iter_bits(held.sustain(0, message.value)):
+                grader.note_off(note)
+    return played
+
+
+def grade_file(path):
+    """Grade one recording against the worker's exercises and return its result row."""
+    row = {"file": path}
+    try:
+        grader = ExerciseGrader(_exercises)
+        row["notes"] = grade_events(grader, load_midi_events(path))
+        row.update(grader.summary())
+    except Exception as e:  # A corrupt file should not stop the rest of the class being graded
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+class CsvWriter:
+    def __init__(self, output):
+        self.output = output
+        self.writer = csv.DictWriter(output, FIELDS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.output.flush()
+
+
+class JsonLinesWriter:
+    def __init__(self, output):
+        self.output = output
+
+    def write(self, row):
+        self.output.write(json.dumps(row) + "\n")
+        self.output.flush()
+
+
+WRITERS = {"csv": CsvWriter, "json": JsonLinesWriter}
+
+
+def grade_files(paths, theory_path, mode, items, variants=(), keys=("C",), jobs=None):
+    """Yield one result row per recording, in the order of `paths`."""
+    jobs = jobs or os.cpu_count() or 1
+    initargs = (theory_path, mode, items, variants, keys)
+    if jobs == 1:
+        init_worker(*initargs)
+        yield from map(grade_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=initargs) as executor:
+        # Small chunks keep every worker busy while rows still come back steadily
+        yield from executor.map(grade_file, paths, chunksize=max(1, min(16, len(paths) // (jobs * 4))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade recorded practice sessions against an exercise spec.")
+    parser.add_argument("files", nargs="+", help=".mid recordings to grade")
+    parser.add_argument("--mode", required=True,
+                        choices=["Notes", "Scales", "Triads", "Sevenths", "Modes", "Shells"])
+    parser.add_argument("--item", action="append", required=True,
+                        help="Quality, e.g. Major, Maj7 or Dorian (can be repeated)")
+    parser.add_argument("--variant", action="append", default=[],
+                        help="Hand, inversion or shell voicing, e.g. Left, First or 7/3 (can be repeated)")
+    parser.add_argument("--key", action="append", default=[],
+                        help="Key of the exercises, in the order they were played (can be repeated, default C)")
+    parser.add_argument("--theory", default="theory.bin", help="Theory store, or the original .pkl")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    parser.add_argument("--output", help="Write results here instead of standard output")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    keys = args.key or ["C"]
+    for key in keys:
+        if SHARP_KEYS.get(key, key) not in KEYS:
+            parser.error(f"unknown key {key!r}")
+    if not build_spec_exercises(load_theory(args.theory), args.mode, args.item, args.variant, keys):
+        parser.error("the theory tables have no exercises for that spec")
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = WRITERS[args.format](output)
+        graded = failed = 0
+        for row in grade_files(args.files, args.theory, args.mode, args.item, args.variant, keys, args.jobs):
+            writer.write(row)
+            graded += 1
+            failed += "error" in row
+    finally:
+        if args.output:
+            output.close()
+    print(f"Graded {graded - failed} recordings, {failed} could not be read", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_batch_grade.py
+"""
+Throughput of batch_grade over a synthetic class of recordings, for 1 worker up to one per core.
+
+Writes the recordings (C and G major scales, right hand, with a few wrong notes and the sustain
+pedal) to a temporary directory with mido, grades them with increasing worker counts and prints
+recordings per second and the speedup over a single worker. Also checks that grading never
+imported Qt. Run from the repository root:
+
+    python benchmarks/bench_batch_grade.py [recordings]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mido
+
+from batch_grade import grade_files
+from theory_store import TheoryStore
+from grading import build_exercise
+
+THEORY_PATH = os.path.join(ROOT, "theory.bin")
+
+
+def write_recording(path, theory, rng):
+    """Both scales up and down at 480 ticks per beat, about one wrong note in twenty."""
+    track = mido.MidiTrack()
+    track.append(mido.Message("control_change", control=64, value=127, time=0))
+    for root in (0, 7):
+        for step in build_exercise(theory, "Scales", "Major", "Right", root).steps:
+            note = 60 + step[0]
+            if rng.random() < 0.05:
+                track.append(mido.Message("note_on", note=note + 1, velocity=70, time=60))
+                track.append(mido.Message("note_on", note=note + 1, velocity=0, time=60))
+            track.append(mido.Message("note_on", note=note, velocity=rng.randrange(50, 110), time=rng.randrange(80, 160)))
+            track.append(mido.Message("note_on", note=note, velocity=0, time=200))
+    track.append(mido.Message("control_change", control=64, value=0, time=0))
+    midi_file = mido.MidiFile()
+    midi_file.tracks.append(track)
+    midi_file.save(path)
+
+
+def main(count=400):
+    theory = TheoryStore(THEORY_PATH)
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number in range(count):
+            path = os.path.join(directory, f"student-{number:04d}.mid")
+            write_recording(path, theory, rng)
+            paths.append(path)
+
+        cores = os.cpu_count() or 1
+        worker_counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+        baseline = None
+        for jobs in worker_counts:
+            start = time.perf_counter()
+            rows = list(grade_files(paths, THEORY_PATH, "Scales", ["Major"], ["Right"], ["C", "G"], jobs))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            scores = [row["score"] for row in rows if "error" not in row]
+            print(f"{jobs:>3} workers: {count / elapsed:8.1f} recordings/s  speedup {baseline / elapsed:4.2f}x  "
+                  f"mean score {sum(scores) / len(scores):.1f}")
+
+    print("Qt imported:", any(name.startswith("PyQt") for name in sys.modules))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
@@ -0,0 +1,47 @@
+# bench_chord_index.py
+"""
+Time ChordIndex.identify_bits over every 4-note combination of MIDI notes.
+
+All 128 notes give C(128, 4) = 10,668,000 lookups, which takes a while in CPython; pass a smaller
+note count to try a subset. Run from the repository root:
+
+    python benchmarks/bench_chord_index.py [note count]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from chord_index import ChordIndex
+from theory_store import TheoryStore
+
+
+def main(note_count=128):
+    start = time.perf_counter()
+    index = ChordIndex(TheoryStore(os.path.join(ROOT, "theory.bin")))
+    print(f"Built index in {(time.perf_counter() - start) * 1e3:.2f} ms: "
+          f"{len(index.by_voicing)} voicing keys, {len(index.by_mask)} pitch-class masks")
+
+    identify_bits = index.identify_bits
+    lookups = recognized = 0
+    start = time.perf_counter()
+    for a in range(note_count):
+        bits_a = 1 << a
+        for b in range(a + 1, note_count):
+            bits_b = bits_a | (1 << b)
+            for c in range(b + 1, note_count):
+                bits_c = bits_b | (1 << c)
+                for d in range(c + 1, note_count):
+                    if identify_bits(bits_c | (1 << d)):
+                        recognized += 1
+                lookups += note_count - c - 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{lookups} combinations of 4 notes out of {note_count}, {recognized} recognized")
+    print(f"{elapsed:.2f} s total, {elapsed / lookups * 1e9:.0f} ns per lookup")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 128)
@@ -0,0 +1,68 @@
+# bench_drill_scheduler.py
+"""
+Time DrillScheduler draws over the full pool (every key, mode, item and variant) and over large
+synthetic pools, to show the cost per draw grows with log n. Also prints how often drills were
+drawn after a simulated session in which a few of them keep being failed.
+Run from the repository root:
+
+    python benchmarks/bench_drill_scheduler.py [draws]
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from drill_scheduler import Drill, DrillScheduler, drill_pool
+from theory_store import TheoryStore
+
+SELECTIONS = {
+    "Scales": (["Major", "Minor", "Harmonic Minor", "Melodic Minor"], ["Right", "Left"]),
+    "Triads": (["Major", "Minor"], ["Root", "First", "Second"]),
+    "Sevenths": (["Maj7", "Min7", "7", "Dim7", "m7f5"], ["Root", "First", "Second", "Third"]),
+    "Modes": (["Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian"], []),
+    "Shells": (["Major", "Minor", "Dominant"], ["3/7", "7/3"]),
+}
+
+
+def summary(score, step_time):
+    return {"score": score, "mean_step_time": step_time}
+
+
+def time_draws(scheduler, draws, results):
+    start = time.perf_counter()
+    for _ in range(draws):
+        scheduler.next()
+        scheduler.record(results)
+    return (time.perf_counter() - start) / draws
+
+
+def main(draws=100_000):
+    theory = TheoryStore(os.path.join(ROOT, "theory.bin"))
+    pool = [drill for mode, (items, variants) in SELECTIONS.items()
+            for drill in drill_pool(theory, mode, items, variants)]
+
+    # Simulate a session: the Dim7 drills are always failed slowly, everything else is played well
+    scheduler = DrillScheduler(pool, rng=random.Random(1))
+    counts = {}
+    for _ in range(draws):
+        drill = scheduler.next()
+        counts[drill.name] = counts.get(drill.name, 0) + 1
+        weak = drill.item == "Dim7"
+        scheduler.record(summary(40, 3.0) if weak else summary(100, 0.6))
+    weak_share = sum(count for name, count in counts.items() if " Dim7 " in name) / draws
+    weak_pool = sum(drill.item == "Dim7" for drill in pool) / len(pool)
+    print(f"Full pool: {len(pool)} drills. Dim7 drills are {weak_pool:.1%} of the pool "
+          f"and got {weak_share:.1%} of {draws} draws")
+
+    for size in (len(pool), 10_000, 100_000, 1_000_000):
+        drills = [Drill("Synthetic", str(number), None, 0, str(number)) for number in range(size)]
+        scheduler = DrillScheduler(drills, rng=random.Random(1))
+        per_draw = time_draws(scheduler, min(draws, 100_000), summary(90, 1.0))
+        print(f"{size:>9} drills: {per_draw * 1e6:6.2f} us per draw + record")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
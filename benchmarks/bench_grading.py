@@ -0,0 +1,82 @@
+# bench_grading.py
+"""
+Replay synthetic MIDI through ExerciseGrader and report the time per event.
+
+Plays every major scale with both hands as fast 16th-note runs (including some wrong notes)
+and every seventh chord inversion, then prints per-event latency. Run from the repository root:
+
+    python benchmarks/bench_grading.py
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from grading import ExerciseGrader, build_exercises
+from theory_store import TheoryStore
+
+NOTE_SPACING = 0.05  # Seconds between notes, 16ths at 300 bpm
+
+
+def synthetic_events(exercises, wrong_note_rate, rng):
+    """Yield ('on'|'off', note, timestamp) events playing the exercises in octave 4."""
+    timestamp = 0.0
+    for exercise in exercises:
+        for step in exercise.steps:
+            if rng.random() < wrong_note_rate:
+                wrong = 60 + step[0] + 1
+                yield "on", wrong, timestamp
+                yield "off", wrong, timestamp + 0.01
+            for note in step:
+                yield "on", 60 + note, timestamp
+            timestamp += NOTE_SPACING
+            for note in step:
+                yield "off", 60 + note, timestamp
+
+
+def replay(grader, events):
+    """Feed events to the grader and return the time each one took."""
+    timings = []
+    clock = time.perf_counter
+    for kind, note, timestamp in events:
+        start = clock()
+        if kind == "on":
+            grader.note_on(note, timestamp)
+        else:
+            grader.note_off(note)
+        timings.append(clock() - start)
+    return timings
+
+
+def report(name, grader, timings):
+    timings.sort()
+    count = len(timings)
+    print(f"{name:<10} {count:>7} events  mean {sum(timings) / count * 1e6:6.2f} us  "
+          f"p99 {timings[int(count * 0.99)] * 1e6:6.2f} us  max {timings[-1] * 1e6:7.2f} us  "
+          f"score {grader.score}")
+
+
+def main(repeats=50):
+    theory = TheoryStore(os.path.join(ROOT, "theory.bin"))
+    rng = random.Random(1)
+
+    scales = []
+    for root in range(12):
+        scales += build_exercises(theory, "Scales", ["Major", "Minor", "Harmonic Minor", "Melodic Minor"],
+                                  ["Right", "Left"], root)
+    sevenths = []
+    for root in range(12):
+        sevenths += build_exercises(theory, "Sevenths", ["Maj7", "Min7", "7", "Dim7", "m7f5"],
+                                    ["Root", "First", "Second", "Third"], root)
+
+    for name, exercises in (("scales", scales), ("sevenths", sevenths)):
+        events = list(synthetic_events(exercises * repeats, 0.02, rng))
+        grader = ExerciseGrader(exercises * repeats)
+        report(name, grader, replay(grader, events))
+
+
+if __name__ == "__main__":
+    main()
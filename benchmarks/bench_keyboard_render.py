@@ -0,0 +1,175 @@
+# bench_keyboard_render.py
+"""
+Frame rate of the keyboard display for chords, trills and every key at once.
+
+The scenarios only use the piano keys that fall inside the keyboard image (four octaves from C3),
+since notes outside it have nothing to repaint. Each frame applies one batch of note changes and
+lets Qt repaint. The PianoKeyboard widget is
+compared with the QGraphicsView + one pixmap item per note setup it replaced. Uses the key images
+from the asset atlas when it has been built and same-sized solid images otherwise. Runs on Qt's
+offscreen platform. Run from the repository root:
+
+    python benchmarks/bench_keyboard_render.py [frames]
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEvent, QObject, Qt
+from PyQt6.QtGui import QColor, QPixmap
+from PyQt6.QtWidgets import QApplication, QGraphicsPixmapItem, QGraphicsScene, QGraphicsView
+
+from keyboard_layout import NOTE_X, NOTE_FILENAMES, NOTE_NAMES, NOTE_COUNT, OCTAVE_WIDTH, PITCH_CLASS_FILENAMES
+from keyboard_widget import PianoKeyboard
+from assets import AssetManager
+
+PIANO_KEYS = range(21, 109)  # A0 to C8, of which the keyboard image shows C3 to B6
+
+# Stand-in image sizes, used when the real images are not available
+FALLBACK_SIZES = {"keys.png": (OCTAVE_WIDTH * 4, 150), "_top.png": (20, 95),
+                  "_left.png": (34, 150), "_mid.png": (34, 150), "_right.png": (34, 150)}
+
+
+def load_image(pixmap, fallback, color):
+    if pixmap.isNull():
+        pixmap = QPixmap(*FALLBACK_SIZES[fallback])
+        pixmap.fill(QColor(color))
+    return pixmap
+
+
+class PaintCounter(QObject):
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+class WidgetRenderer:
+    name = "PianoKeyboard"
+
+    def __init__(self, background, highlights):
+        self.widget = PianoKeyboard(background)
+        self.highlights = highlights
+        self.painted = self.widget
+
+    def note_on(self, note):
+        self.widget.set_note(note, self.highlights[NOTE_FILENAMES[note]])
+
+    def note_off(self, note):
+        self.widget.clear_note(note)
+
+
+class SceneRenderer:
+    """The previous display: a default QGraphicsView with a hidden pixmap item per note."""
+    name = "QGraphicsView"
+
+    def __init__(self, background, highlights):
+        self.scene = QGraphicsScene()
+        self.scene.addItem(QGraphicsPixmapItem(background))
+        self.widget = QGraphicsView(self.scene)
+        self.widget.setFixedSize(background.size())
+        self.widget.setSceneRect(0, 0, background.width(), background.height())
+        self.widget.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.widget.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.items = []
+        for note in range(NOTE_COUNT):
+            item = QGraphicsPixmapItem()
+            item.setPos(NOTE_X[note], 0)
+            item.hide()
+            self.scene.addItem(item)
+            self.items.append(item)
+        self.highlights = highlights
+        self.painted = self.widget.viewport()
+
+    def note_on(self, note):
+        item = self.items[note]
+        item.setPixmap(self.highlights[NOTE_FILENAMES[note]])
+        item.show()
+
+    def note_off(self, note):
+        self.items[note].hide()
+
+
+def drawn_keys(background):
+    """The piano keys whose highlight lands inside the keyboard image"""
+    return [note for note in PIANO_KEYS if 0 <= NOTE_X[note] < background.width()]
+
+
+def chord_frames(frames, rng, keys):
+    """Each frame releases the previous four-note chord and plays another anywhere on the keyboard."""
+    previous = []
+    for _ in range(frames):
+        root = rng.randrange(keys[0], keys[-1] - 10)
+        chord = [root, root + 4, root + 7, root + 11]
+        yield previous, chord
+        previous = chord
+
+
+def trill_frames(frames, rng, keys):
+    """Two-note trills swept up and down the keyboard, one note change per frame."""
+    sweep = keys[:-1] + keys[-2::-1]
+    for frame in range(frames):
+        note = sweep[(frame // 8) % len(sweep)]
+        lower, upper = (note, note + 1) if frame % 2 else (note + 1, note)
+        yield [lower], [upper]
+
+
+def sweep_frames(frames, rng, keys):
+    """Every key pressed together, then all released."""
+    for frame in range(frames):
+        if frame % 2:
+            yield keys, []
+        else:
+            yield [], keys
+
+
+SCENARIOS = {"chords": chord_frames, "trills": trill_frames, "all keys": sweep_frames}
+
+
+def run(app, renderer, scenario, frames, keys):
+    counter = PaintCounter()
+    renderer.painted.installEventFilter(counter)
+    renderer.widget.show()
+    app.processEvents()
+    counter.paints = 0
+
+    start = time.perf_counter()
+    for released, pressed in scenario(frames, random.Random(1), keys):
+        for note in released:
+            renderer.note_off(note)
+        for note in pressed:
+            renderer.note_on(note)
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    renderer.widget.hide()
+    return elapsed, counter.paints
+
+
+def main(frames=2000):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    assets = AssetManager()
+    background = load_image(assets.background(), "keys.png", "white")
+    highlights = {filename: load_image(assets.highlight("green", filename), filename, "green")
+                  for filename in set(PITCH_CLASS_FILENAMES)}
+    keys = drawn_keys(background)
+    print(f"Keys {NOTE_NAMES[keys[0]]} to {NOTE_NAMES[keys[-1]]}")
+
+    for scenario_name, scenario in SCENARIOS.items():
+        for renderer_class in (WidgetRenderer, SceneRenderer):
+            renderer = renderer_class(background, highlights)
+            elapsed, paints = run(app, renderer, scenario, frames, keys)
+            print(f"{scenario_name:<9} {renderer.name:<14} {frames / elapsed:9.0f} frames/s  "
+                  f"{elapsed / frames * 1e3:7.3f} ms/frame  {paints} paints")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,89 @@
+# bench_midi_input.py
+"""
+Measure idle CPU use of MidiInputThread and note-to-handler latency.
+
+Opens a virtual MIDI port (needs the python-rtmidi backend), attaches a MidiInputThread to it
+and sends notes through the port. Run from the repository root:
+
+    python benchmarks/bench_midi_input.py
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mido
+from PyQt6.QtCore import QCoreApplication
+from midi_handler import MidiInputThread
+
+PORT_NAME = "JazzPiano benchmark"
+
+
+class LatencyRecorder:
+    """Stands in for the Practical tab and records when each message arrives."""
+
+    def __init__(self):
+        self.sent_at = {}
+        self.latencies = []
+
+    def handle_midi_message(self, message):
+        received = time.perf_counter()
+        sent = self.sent_at.pop(message.note, None)
+        if sent is not None:
+            self.latencies.append(received - sent)
+
+
+def find_input_name(port_name):
+    """Backends decorate virtual port names (e.g. ALSA adds client:port), so match by substring."""
+    for name in mido.get_input_names():
+        if port_name in name:
+            return name
+    return port_name
+
+
+def measure_idle_cpu(seconds):
+    """Return the process CPU time used per wall-clock second while idle."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    return (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+
+def measure_latency(outport, recorder, count):
+    for i in range(count):
+        note = 36 + i % 48
+        recorder.sent_at[note] = time.perf_counter()
+        outport.send(mido.Message("note_on", note=note, velocity=64))
+        time.sleep(0.005)
+    time.sleep(0.1)
+    return recorder.latencies
+
+
+def main():
+    app = QCoreApplication(sys.argv)
+    recorder = LatencyRecorder()
+    with mido.open_output(PORT_NAME, virtual=True) as outport:
+        thread = MidiInputThread(recorder, find_input_name(PORT_NAME))
+        thread.start()
+        time.sleep(0.5)  # Let the thread open the port
+
+        idle = measure_idle_cpu(3.0)
+        latencies = measure_latency(outport, recorder, 500)
+
+        thread.stop()
+
+    print(f"Idle CPU: {idle * 100:.2f}% of one core")
+    if latencies:
+        latencies.sort()
+        print(f"Latency over {len(latencies)} notes: "
+              f"mean {statistics.mean(latencies) * 1e3:.3f} ms, "
+              f"p50 {latencies[len(latencies) // 2] * 1e3:.3f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.3f} ms")
+    else:
+        print("No messages received.")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_persistence.py
+"""
+Measure bursts of settings/progress updates through WriteBehindWriter.
+
+Compares the old behaviour (pickle the whole dictionary synchronously on every change) with
+write-behind saving, reporting the time spent on the calling (GUI) thread per update, the number
+of files written and the time until the final flush is on disk. Run from the repository root:
+
+    python benchmarks/bench_persistence.py
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import WriteBehindWriter
+
+
+def make_data(size):
+    return {f"progress/{i}": {"attempts": i, "correct": i // 2} for i in range(size)} | {"name": "student"}
+
+
+def synchronous(path, data, updates):
+    start = time.perf_counter()
+    for i in range(updates):
+        data[f"setting/{i % 50}"] = str(i)
+        with open(path, "wb") as file:
+            pickle.dump(data, file)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, updates
+
+
+def write_behind(path, data, updates):
+    writer = WriteBehindWriter(path, delay=0.05)
+    start = time.perf_counter()
+    for i in range(updates):
+        data[f"setting/{i % 50}"] = str(i)
+        writer.save(dict(data))
+    caller = time.perf_counter() - start
+    writer.flush()
+    total = time.perf_counter() - start
+    writer.close()
+    return caller, total, writer.writes
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "shared_data.pkl")
+        print(f"{'mode':<13} {'keys':>6} {'updates':>8} {'caller us/update':>17} {'flushed ms':>11} {'writes':>7}")
+        for size in (10, 1000):
+            for updates in (1000, 10000):
+                for name, run in (("synchronous", synchronous), ("write-behind", write_behind)):
+                    caller, total, writes = run(path, make_data(size), updates)
+                    print(f"{name:<13} {size:>6} {updates:>8} {caller / updates * 1e6:>17.2f} "
+                          f"{total * 1e3:>11.1f} {writes:>7}")
+                with open(path, "rb") as file:
+                    assert pickle.load(file)[f"setting/{(updates - 1) % 50}"] == str(updates - 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# bench_startup.py
+"""
+Measure cold start of the main window: interpreter start + imports, time to first frame, and time
+until the work deferred past the first frame (theory index, session log, MIDI) is done.
+
+Each run starts a fresh interpreter on Qt's offscreen platform and goes through the same steps as
+main.main(): build Oralia, show it and run the event loop, so the first paint queues
+finish_startup. The run exits once finish_startup returns. The practice log goes to a temporary
+directory. Exits with status 1 if the median time until startup is finished is over the budget.
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--runs 10] [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import time
+imports_started = time.perf_counter()
+import json, os, sys
+from PyQt6.QtCore import QObject, QEvent
+from PyQt6.QtWidgets import QApplication
+import main
+imports_done = time.perf_counter()
+times = {"imports": imports_done - imports_started}
+
+class FirstFrame(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and "painted_at" not in times:
+            times["window"] = time.perf_counter() - imports_done
+            times["painted_at"] = time.time()
+        return False
+
+app = QApplication(sys.argv[:1])
+window = main.Oralia(session_dir=sys.argv[1])
+finish_startup = window.finish_startup
+
+def finish_and_report():
+    finish_startup()
+    times["deferred"] = time.time() - times["painted_at"]
+    times["ready_at"] = time.time()
+    print(json.dumps(times), flush=True)
+    os._exit(0)  # Skip teardown, only the startup path is being measured
+
+window.finish_startup = finish_and_report  # Looked up when the first paint queues it
+first_frame = FirstFrame()
+window.installEventFilter(first_frame)
+window.show()
+app.exec()
+"""
+
+
+def run_once():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    with tempfile.TemporaryDirectory() as session_dir:
+        launched = time.time()
+        output = subprocess.run([sys.executable, "-c", CHILD, session_dir], cwd=ROOT, env=env,
+                                check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["first_frame"] = result["painted_at"] - launched
+    result["ready"] = result["ready_at"] - launched
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    for key, label in (("imports", "imports"), ("window", "build + first paint"),
+                       ("first_frame", "launch to first frame"), ("deferred", "deferred startup"),
+                       ("ready", "launch to ready")):
+        values = [result[key] * 1e3 for result in results]
+        print(f"{label:<22} median {statistics.median(values):8.1f} ms  min {min(values):8.1f} ms")
+
+    median = statistics.median(result["ready"] for result in results) * 1e3
+    if median > args.budget_ms:
+        print(f"Over budget: {median:.1f} ms > {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
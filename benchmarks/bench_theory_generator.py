@@ -0,0 +1,63 @@
+# bench_theory_generator.py
+"""
+Check that theory_generator reproduces the tables in theory.pkl, then time generating them.
+
+The check compares every generated section with the pickle, including key order, and exits with
+status 1 on any difference. Run from the repository root:
+
+    python benchmarks/bench_theory_generator.py [repeats]
+"""
+import os
+import pickle
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from theory_generator import generate_tables, generate_theory
+
+
+def ordered(value):
+    """Nested dicts as lists of pairs, so that comparing them also compares key order."""
+    if isinstance(value, dict):
+        return [(key, ordered(item)) for key, item in value.items()]
+    return value
+
+
+def check(theory):
+    tables = generate_tables()
+    failed = False
+    for name, table in tables.items():
+        same = ordered(table) == ordered(theory[name])
+        failed |= not same
+        print(f"{name:<9} {'matches' if same else 'DIFFERS from'} theory.pkl")
+    if ordered(generate_theory(theory)) != ordered(theory):
+        print("Merged theory differs from theory.pkl")
+        failed = True
+    return not failed
+
+
+def main(repeats=200):
+    with open(os.path.join(ROOT, "theory.pkl"), "rb") as file:
+        theory = pickle.load(file)
+    if not check(theory):
+        sys.exit(1)
+
+    generate_tables()  # Warm up NumPy
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tables = generate_tables()
+    elapsed = (time.perf_counter() - start) / repeats
+    entries = sum(len(table) for table in tables.values())
+    print(f"Generated {len(tables)} tables ({entries} top-level entries) in {elapsed * 1e3:.3f} ms")
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        pickle.loads(pickle.dumps({name: theory[name] for name in tables}))
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"For comparison, a pickle round trip of the same tables takes {elapsed * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
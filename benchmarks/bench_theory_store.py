@@ -0,0 +1,110 @@
+# bench_theory_store.py
+"""
+Compare loading theory.pkl with opening theory.bin through TheoryStore.
+
+Cold times are measured in fresh interpreter processes, warm times by repeating the load in
+this process. Resident memory is the peak RSS growth of a fresh process over the load.
+Run from the repository root:
+
+    python benchmarks/bench_theory_store.py
+"""
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from theory_store import TheoryStore
+
+PICKLE_PATH = os.path.join(ROOT, "theory.pkl")
+STORE_PATH = os.path.join(ROOT, "theory.bin")
+
+# 'store (open)' only maps the file and reads the section index, which is all Practical does at
+# construction. 'store (full)' additionally decodes every section.
+LOADERS = {
+    "pickle": "import pickle\nwith open(PATH_PKL, 'rb') as f:\n    theory = pickle.load(f)\n",
+    "store (open)": "from theory_store import TheoryStore\ntheory = TheoryStore(PATH_BIN)\n",
+    "store (full)": ("from theory_store import TheoryStore\ntheory = TheoryStore(PATH_BIN)\n"
+                     "for name in theory:\n    theory[name]\n"),
+}
+
+CHILD = """
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+PATH_PKL, PATH_BIN = {pkl!r}, {bin!r}
+
+def rss_kb():
+    # Current resident set size where /proc is available, otherwise the peak
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+rss_before = rss_kb()
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+rss_after = rss_kb()
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_after - rss_before}}))
+"""
+
+
+def cold(code, runs):
+    """Run the loader in fresh processes and return the best time and the median RSS growth."""
+    script = CHILD.format(root=ROOT, pkl=PICKLE_PATH, bin=STORE_PATH, code=code)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True)
+        results.append(json.loads(output.stdout))
+    rss = sorted(result["rss_kb"] for result in results)[len(results) // 2]
+    return min(result["seconds"] for result in results), rss
+
+
+def warm(load, runs):
+    """Return the best in-process time and the traced allocation peak of one load."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def load_pickle():
+    with open(PICKLE_PATH, "rb") as file:
+        return pickle.load(file)
+
+
+def load_store_open():
+    return TheoryStore(STORE_PATH)
+
+
+def load_store_full():
+    store = TheoryStore(STORE_PATH)
+    for name in store:
+        store[name]
+    return store
+
+
+def main(runs=20):
+    warm_loaders = {"pickle": load_pickle, "store (open)": load_store_open, "store (full)": load_store_full}
+    print(f"theory.pkl {os.path.getsize(PICKLE_PATH)} bytes, theory.bin {os.path.getsize(STORE_PATH)} bytes")
+    print(f"{'loader':<14} {'cold ms':>9} {'warm ms':>9} {'alloc KiB':>10} {'RSS KiB':>8}")
+    for name, code in LOADERS.items():
+        cold_seconds, rss_kb = cold(code, max(3, runs // 4))
+        warm_seconds, peak = warm(warm_loaders[name], runs)
+        print(f"{name:<14} {cold_seconds * 1e3:>9.3f} {warm_seconds * 1e3:>9.3f} {peak / 1024:>10.1f} {rss_kb:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# chord_index.py
+"""
+Recognize chords and modes from the set of held notes.
+
+Held notes are a 128-bit integer bitset (bit n set while MIDI note n is down). Every voicing in the
+theory tables is reduced to a 12-bit pitch-class mask; the exact-voicing key additionally stores the
+pitch class of the lowest note, which is what tells inversions apart:
+
+    voicing key = pitch-class mask | (bass pitch class << 12)
+
+so recognizing the held notes costs one dict lookup whatever the table sizes are.
+"""
+
+# Theory['Shells'] stores the two voicings under 0 and 1, shown in the GUI as '3/7' and '7/3'
+SHELL_VOICINGS = {0: "3/7", 1: "7/3"}
+
+_OCTAVE_MASK = 0xFFF
+
+
+def pitch_class_mask(notes):
+    """Return the 12-bit pitch-class mask of an iterable of note numbers."""
+    mask = 0
+    for note in notes:
+        mask |= 1 << (note % 12)
+    return mask
+
+
+def notes_to_bits(notes):
+    """Return the held-notes bitset for an iterable of note numbers."""
+    bits = 0
+    for note in notes:
+        bits |= 1 << note
+    return bits
+
+
+def bits_pitch_class_mask(bits):
+    """Fold a held-notes bitset into a 12-bit pitch-class mask (at most 11 shifts for 128 notes)."""
+    mask = 0
+    while bits:
+        mask |= bits & _OCTAVE_MASK
+        bits >>= 12
+    return mask
+
+
+def lowest_note(bits):
+    """Return the lowest note in a non-empty held-notes bitset."""
+    return (bits & -bits).bit_length() - 1
+
+
+def voicing_key(notes):
+    """Return the exact-voicing key of a list of note numbers."""
+    return pitch_class_mask(notes) | ((min(notes) % 12) << 12)
+
+
+class ChordIndex:
+    """
+    Maps pitch-class masks and exact-voicing keys to (name, inversion) matches.
+
+    Built once from Theory['Triads'], ['Sevenths'], ['Shells'] and ['Modes']. Several entries can
+    share a key (a diminished seventh in first inversion is also another diminished seventh in root
+    position, C# and Db shells are duplicates), so lookups return a tuple of matches in table order.
+    """
+
+    def __init__(self, theory):
+        self.by_voicing = {}
+        self.by_mask = {}
+        for name, inversions in theory.get("Triads", {}).items():
+            for inversion, notes in inversions.items():
+                self.add(notes, name, inversion)
+        for name, inversions in theory.get("Sevenths", {}).items():
+            for inversion, notes in inversions.items():
+                self.add(notes, name, inversion)
+        for shells in theory.get("Shells", {}).values():
+            for name, voicings in shells.items():
+                for voicing, notes in voicings.items():
+                    self.add(notes, name, SHELL_VOICINGS.get(voicing, str(voicing)))
+        for root, modes in theory.get("Modes", {}).items():
+            for mode, notes in modes.items():
+                self.add(notes, f"{root} {mode}", "")
+
+    def add(self, notes, name, inversion):
+        match = (name, inversion)
+        key = voicing_key(notes)
+        if match not in self.by_voicing.get(key, ()):
+            self.by_voicing[key] = self.by_voicing.get(key, ()) + (match,)
+        mask = key & _OCTAVE_MASK
+        if match not in self.by_mask.get(mask, ()):
+            self.by_mask[mask] = self.by_mask.get(mask, ()) + (match,)
+
+    def identify_bits(self, bits):
+        """Return the matches for a held-notes bitset, or () if nothing is held or nothing matches."""
+        if not bits:
+            return ()
+        return self.by_voicing.get(bits_pitch_class_mask(bits) | ((lowest_note(bits) % 12) << 12), ())
+
+    def identify(self, notes):
+        """Return the matches for an iterable of note numbers."""
+        return self.identify_bits(notes_to_bits(notes))
+
+    def identify_any_voicing(self, notes):
+        """Return the matches for the pitch classes of the notes, ignoring which note is lowest."""
+        return self.by_mask.get(pitch_class_mask(notes), ())
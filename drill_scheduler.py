@@ -0,0 +1,100 @@
+# drill_scheduler.py
+"""
+Randomized spaced-repetition drills over a pool of exercises.
+
+The pool is every combination of key, selected item and selected variant (hand, inversion or
+voicing). Each drill fires after an exponentially distributed wait whose rate is
+weight / interval, and the drill with the earliest fire time is played next. That makes every draw
+a weighted random choice, and because exponential waits are memoryless only the drill just played
+has to be rescheduled: a draw is one heap pop and one heap push, O(log n) in the pool size.
+
+weight   grows with the drill's recent error rate and with how slow its steps are.
+interval is the spaced-repetition part: it doubles every time the drill is passed and drops back
+         to 1 when it is failed, so mastered drills come round less and less often.
+"""
+from collections import namedtuple
+import heapq
+import random
+
+from grading import exercise_name
+
+Drill = namedtuple("Drill", "theory_mode item variant root name")
+
+PASS_SCORE = 80  # Grader score (percent) a drill needs to count as passed
+EASE = 2.0  # Interval growth on a pass
+MAX_INTERVAL = 64.0
+RECENT = 0.3  # Weight of the latest result in the running error rate and step time
+UNSEEN_ERROR_RATE = 0.5  # Assumed for drills with no history, so new drills come up early
+TARGET_STEP_TIME = 1.0  # Seconds per step considered fluent
+MIN_WEIGHT = 0.05  # Keeps perfectly played drills in rotation
+
+
+def drill_pool(theory, theory_mode, items, variants=(), roots=range(12)):
+    """Every (key, item, variant) drill for a selection. Notes are not key dependent, so they get one drill each."""
+    if theory_mode == "Notes":
+        roots = (0,)
+    return [Drill(theory_mode, item, variant, root,
+                  exercise_name(theory_mode, item, variant, theory["Enharmonic"][root]))
+            for root in roots for item in items for variant in (variants or [None])]
+
+
+class DrillScheduler:
+    def __init__(self, drills, session_log=None, rng=None):
+        """
+        :param drills: The pool, e.g. from drill_pool()
+        :param session_log: A SessionLog whose totals seed each drill's error rate
+        :param rng: A random.Random, for reproducible draws
+        """
+        self.drills = drills
+        self.rng = rng or random.Random()
+        self.error_rates = []
+        self.step_times = [TARGET_STEP_TIME] * len(drills)
+        self.intervals = [1.0] * len(drills)
+        for drill in drills:
+            stats = session_log.stats(drill.name) if session_log is not None else None
+            if stats and stats["attempts"]:
+                self.error_rates.append(1 - stats["correct"] / stats["attempts"])
+            else:
+                self.error_rates.append(UNSEEN_ERROR_RATE)
+
+        self.clock = 0.0
+        self.current = None  # Index of the drill handed out by next() and not yet recorded
+        self.heap = []
+        for index in range(len(drills)):
+            self.schedule(index)
+
+    def __len__(self):
+        return len(self.drills)
+
+    def weight(self, index):
+        slowness = self.step_times[index] / TARGET_STEP_TIME
+        return (MIN_WEIGHT + self.error_rates[index]) * max(slowness, 0.5)
+
+    def schedule(self, index):
+        rate = self.weight(index) / self.intervals[index]
+        heapq.heappush(self.heap, (self.clock + self.rng.expovariate(rate), index))
+
+    def next(self):
+        """Draw the next drill, or None if the pool is empty. A drill skipped without a result keeps its stats."""
+        if self.current is not None:
+            self.schedule(self.current)
+        if not self.heap:
+            return None
+        self.clock, self.current = heapq.heappop(self.heap)
+        return self.drills[self.current]
+
+    def record(self, summary):
+        """Update the current drill from an ExerciseGrader summary and put it back in the pool."""
+        index = self.current
+        if index is None:
+            return
+        error_rate = 1 - summary["score"] / 100
+        self.error_rates[index] += RECENT * (error_rate - self.error_rates[index])
+        if summary["mean_step_time"]:
+            self.step_times[index] += RECENT * (summary["mean_step_time"] - self.step_times[index])
+        if summary["score"] >= PASS_SCORE:
+            self.intervals[index] = min(self.intervals[index] * EASE, MAX_INTERVAL)
+        else:
+            self.intervals[index] = 1.0
+        self.current = None
+        self.schedule(index)
@@ -0,0 +1,239 @@
+# grading.py
+"""
+Incremental exercise grading.
+
+An exercise is a sequence of steps built from the theory tables: one note per step for scales,
+modes and notes, all chord tones at once for triads, sevenths and shells. ExerciseGrader advances
+through the steps as note_on/note_off events arrive, doing a constant amount of work per event,
+and keeps running totals for correctness, timing and streaks so nothing is ever rescanned.
+
+Notes are matched by pitch class, so exercises can be played in any octave. For chords the lowest
+note played must also have the pitch class of the expected bass note, which is what tells
+inversions apart.
+"""
+
+# Theory['Shells'] stores the '3/7' voicing under 0 and '7/3' under 1
+SHELL_VOICINGS = {"3/7": 0, "7/3": 1}
+
+
+class Exercise:
+    """A named sequence of steps. Each step is a list of MIDI notes that must all be played."""
+
+    def __init__(self, name, steps, fingering=None):
+        self.name = name
+        self.steps = steps
+        self.fingering = fingering  # One finger number per step, or None
+
+    def __repr__(self):
+        return f"Exercise({self.name!r}, {len(self.steps)} steps)"
+
+
+def up_and_down(notes):
+    """Return an ascending run followed by the same run descending, e.g. [0, 2, 4, 2, 0]."""
+    return notes + notes[-2::-1]
+
+
+# Variant used when nothing is selected in the third list
+DEFAULT_VARIANTS = {"Scales": "Right", "Triads": "Root", "Sevenths": "Root", "Shells": "3/7"}
+
+
+def exercise_name(theory_mode, item, variant=None, key="C"):
+    """The name an exercise is shown and logged under, e.g. 'Db Major (Left)' or 'C Maj7 First'."""
+    variant = variant or DEFAULT_VARIANTS.get(theory_mode)
+    if theory_mode == "Notes":
+        return item
+    if theory_mode == "Scales":
+        return f"{key} {item} ({variant})"
+    if theory_mode == "Modes":
+        return f"{key} {item}"
+    return f"{key} {item} {variant}"
+
+
+def build_exercise(theory, theory_mode, item, variant=None, root=0):
+    """
+    Build one exercise from the theory tables.
+
+    :param theory: The theory tables (a TheoryStore or the unpickled dictionary)
+    :param theory_mode: "Notes", "Scales", "Triads", "Sevenths", "Modes" or "Shells"
+    :param item: The quality selected in the second list (e.g. "Major", "Maj7", "Dorian")
+    :param variant: The hand, inversion or shell voicing selected in the third list
+    :param root: Pitch class of the key, 0 for C
+    :return: An Exercise, or None if the tables have no entry for the selection
+    """
+    key = theory["Enharmonic"][root % 12]
+    variant = variant or DEFAULT_VARIANTS.get(theory_mode)
+    name = exercise_name(theory_mode, item, variant, key)
+    try:
+        if theory_mode == "Notes":
+            return Exercise(name, [[note] for note in theory["Notes"][item]])
+
+        if theory_mode == "Scales":
+            notes = theory["Scales"][item][root % 12]
+            fingering = theory["Fingering"][root % 12][f"{key} {item}"][variant]
+            return Exercise(name, [[note] for note in up_and_down(notes)], up_and_down(fingering))
+
+        if theory_mode == "Modes":
+            notes = theory["Modes"][key][item]
+            return Exercise(name, [[note] for note in up_and_down(notes)])
+
+        if theory_mode in ("Triads", "Sevenths"):
+            return Exercise(name, [theory[theory_mode][f"{key} {item}"][variant]])
+
+        if theory_mode == "Shells":
+            notes = theory["Shells"][item][f"{key} {item}"][SHELL_VOICINGS[variant]]
+            return Exercise(name, [notes])
+    except KeyError:
+        return None
+    return None
+
+
+def build_exercises(theory, theory_mode, items, variants=(), root=0):
+    """Build one exercise for every selected item and variant, skipping selections with no table entry."""
+    exercises = []
+    for item in items:
+        for variant in (variants or [None]):
+            exercise = build_exercise(theory, theory_mode, item, variant, root)
+            if exercise is not None:
+                exercises.append(exercise)
+    return exercises
+
+
+class ExerciseGrader:
+    """
+    State machine that grades played notes against a list of exercises, played back to back.
+
+    Each step is precompiled into a pitch-class mask and a bass pitch class, so note_on and
+    note_off are O(1) whatever the exercise length.
+    """
+
+    def __init__(self, exercises):
+        self.exercises = exercises
+        self.step_masks = []
+        self.step_bass = []
+        self.step_fingers = []
+        self.step_exercise = []  # Index into exercises for every step
+        for number, exercise in enumerate(exercises):
+            for position, notes in enumerate(exercise.steps):
+                mask = 0
+                for note in notes:
+                    mask |= 1 << (note % 12)
+                self.step_masks.append(mask)
+                self.step_bass.append(min(notes) % 12)
+                self.step_fingers.append(exercise.fingering[position] if exercise.fingering else None)
+                self.step_exercise.append(number)
+        self.reset()
+
+    def reset(self):
+        self.position = 0
+        self.hit_mask = 0  # Pitch classes of the current step played so far
+        self.step_notes = 0  # Bitset of the MIDI notes that produced hit_mask
+        self.step_lowest = None  # Lowest note played for the current step
+        self.step_failed = False  # A wrong note was played during the current step
+        self.step_started = None  # Timestamp the current step started
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+        self.correct_steps = 0
+        self.failed_steps = 0
+        self.wrong_notes = 0
+        self.streak = 0
+        self.best_streak = 0
+        self.total_step_time = 0.0
+        self.slowest_step = 0.0
+        self.last_step_time = 0.0
+
+    @property
+    def finished(self):
+        return self.position >= len(self.step_masks)
+
+    @property
+    def current_exercise(self):
+        """The exercise the next expected step belongs to, or None once finished."""
+        return None if self.finished else self.exercises[self.step_exercise[self.position]]
+
+    @property
+    def expected_finger(self):
+        return None if self.finished else self.step_fingers[self.position]
+
+    def note_on(self, note, timestamp):
+        """
+        Grade a pressed note. Returns True if it belongs to the current step, False if it is wrong
+        and None once the exercise is finished.
+        """
+        if self.position >= len(self.step_masks):
+            return None
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        if self.step_started is None:
+            self.step_started = timestamp
+        self.last_timestamp = timestamp
+
+        bit = 1 << (note % 12)
+        expected = self.step_masks[self.position]
+        if not bit & expected:
+            self.wrong_notes += 1
+            self.step_failed = True
+            self.streak = 0
+            return False
+
+        self.hit_mask |= bit
+        self.step_notes |= 1 << note
+        if self.step_lowest is None or note < self.step_lowest:
+            self.step_lowest = note
+        if self.hit_mask == expected:
+            self.complete_step(timestamp)
+        return True
+
+    def note_off(self, note):
+        """A chord tone released before the whole chord was down has to be played again."""
+        if self.step_notes & (1 << note):
+            self.step_notes &= ~(1 << note)
+            self.hit_mask &= ~(1 << (note % 12))
+            if note == self.step_lowest:
+                self.step_lowest = None
+
+    def complete_step(self, timestamp):
+        correct = not self.step_failed and self.step_lowest % 12 == self.step_bass[self.position]
+        if correct:
+            self.correct_steps += 1
+            self.streak += 1
+            if self.streak > self.best_streak:
+                self.best_streak = self.streak
+        else:
+            self.failed_steps += 1
+            self.streak = 0
+
+        step_time = timestamp - self.step_started
+        self.last_step_time = step_time
+        self.total_step_time += step_time
+        if step_time > self.slowest_step:
+            self.slowest_step = step_time
+
+        self.position += 1
+        self.hit_mask = 0
+        self.step_notes = 0
+        self.step_lowest = None
+        self.step_failed = False
+        # The next step starts as soon as this one is complete, so hesitation counts against it
+        self.step_started = timestamp
+
+    @property
+    def score(self):
+        """Percentage of completed steps played without a wrong note or wrong inversion."""
+        completed = self.correct_steps + self.failed_steps
+        return round(100 * self.correct_steps / completed) if completed else 100
+
+    def summary(self):
+        completed = self.correct_steps + self.failed_steps
+        return {
+            "steps": len(self.step_masks),
+            "completed": completed,
+            "correct": self.correct_steps,
+            "failed": self.failed_steps,
+            "wrong_notes": self.wrong_notes,
+            "score": self.score,
+            "best_streak": self.best_streak,
+            "mean_step_time": self.total_step_time / completed if completed else 0.0,
+            "slowest_step_time": self.slowest_step,
+            "duration": (self.last_timestamp - self.first_timestamp) if self.first_timestamp is not None else 0.0,
+        }
@@ -0,0 +1,83 @@
+# held_notes.py
+"""
+State of the keys and the sustain pedal.
+
+A note is 'pressed' while its key is down. Every connected device has its own sustain pedal
+(CC64): a key released while any pedal is down is 'sustained' by each pedal that is down, and keeps
+sounding until it is pressed again or none of those pedals still holds it. The 'sounding' set is
+the pressed notes plus every pedal's sustained notes, and it is what the key highlights, chord
+recognition and grading follow. All of these are 128-bit bitsets (bit n for MIDI note n), so every
+event is a few integer operations per pedal that is down; lifting a pedal costs one step per note
+it releases.
+"""
+from array import array
+
+from keyboard_layout import NOTE_COUNT
+
+SUSTAIN_THRESHOLD = 64  # CC64 values from this up mean the pedal is down
+
+
+def iter_bits(bits):
+    """Yield the note numbers set in a bitset, lowest first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class HeldNotes:
+    def __init__(self):
+        self.velocities = array('B', bytes(NOTE_COUNT))  # Velocity of each note's latest note_on
+        self.onsets = array('d', bytes(8 * NOTE_COUNT))  # Timestamp of each note's latest note_on
+        self.reset()
+
+    def reset(self):
+        self.pressed = 0
+        self.sustained = {}  # device -> notes its pedal holds, only for devices whose pedal is down
+        self.sounding = 0
+
+    def __contains__(self, note):
+        return bool(self.sounding >> note & 1)
+
+    def note_on(self, note, velocity, timestamp):
+        """
+        Press a key. A velocity of 0 is the running-status encoding of note_off and is treated as one.
+        Returns True if the note was pressed, or what note_off returned for velocity 0.
+        """
+        if not velocity:
+            return self.note_off(note)
+        bit = 1 << note
+        self.pressed |= bit
+        for device, sustained in self.sustained.items():
+            self.sustained[device] = sustained & ~bit
+        self.sounding |= bit
+        self.velocities[note] = velocity
+        self.onsets[note] = timestamp
+        return True
+
+    def note_off(self, note):
+        """Release a key. Returns True if the note stopped sounding, False if a pedal holds it."""
+        bit = 1 << note
+        if not self.pressed & bit:
+            return False
+        self.pressed &= ~bit
+        if self.sustained:
+            for device, sustained in self.sustained.items():
+                self.sustained[device] = sustained | bit
+            return False
+        self.sounding &= ~bit
+        return True
+
+    def sustain(self, device, value):
+        """
+        Apply a CC64 value from a device. Returns the bitset of notes that stopped sounding because
+        its pedal was lifted; notes still pressed or held by another device's pedal keep sounding.
+        """
+        if value >= SUSTAIN_THRESHOLD:
+            self.sustained.setdefault(device, 0)
+            return 0
+        released = self.sustained.pop(device, 0) & ~self.pressed
+        for sustained in self.sustained.values():
+            released &= ~sustained
+        self.sounding &= ~released
+        return released
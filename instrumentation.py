@@ -0,0 +1,118 @@
+# instrumentation.py
+"""
+Optional timing of the MIDI -> scene pipeline.
+
+Set JAZZPIANO_PROFILE=1 to enable it. Each stage records durations into a fixed-size histogram with
+power-of-two microsecond buckets, so recording allocates nothing and the histograms are printed
+when the application exits. When disabled, every call site is skipped behind a single
+`if instrumentation.ENABLED:` check.
+
+Every histogram has a single writer: each MIDI device's callback thread records into its own
+histogram, which report() merges, and the other stages are all recorded on the GUI thread.
+
+Stages recorded:
+    callback     time spent in the mido callback queuing a message
+    queue        time a message waited in the event buffer before the GUI thread drained it
+    note_handler time to apply one drained batch (highlights, labels, grading)
+    insert_note  time to show one key highlight
+    delete_note  time to hide one key highlight
+    frame        time from the oldest message in a batch being queued to the view repainting
+"""
+from array import array
+import atexit
+import os
+import sys
+import time
+
+ENABLED = os.environ.get("JAZZPIANO_PROFILE", "") not in ("", "0")
+
+BUCKETS = 32  # Bucket b holds durations below 2**b microseconds; the last one collects the rest
+
+now = time.perf_counter
+
+
+class Histogram:
+    """Fixed-size log2 histogram of durations in seconds."""
+
+    def __init__(self):
+        self.buckets = array('Q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        microseconds = int(seconds * 1e6)
+        bucket = microseconds.bit_length() if microseconds > 0 else 0
+        self.buckets[bucket if bucket < BUCKETS else BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Add another histogram's samples to this one."""
+        for bucket, samples in enumerate(other.buckets):
+            self.buckets[bucket] += samples
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """Upper bound, in seconds, of the bucket containing the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, samples in enumerate(self.buckets):
+            seen += samples
+            if seen >= target:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return "no samples"
+        return (f"n={self.count} mean={self.total / self.count * 1e3:.3f} ms "
+                f"p50<={self.percentile(0.5) * 1e3:.3f} ms p99<={self.percentile(0.99) * 1e3:.3f} ms "
+                f"max={self.max * 1e3:.3f} ms")
+
+
+STAGES = ("callback", "queue", "note_handler", "insert_note", "delete_note", "frame")
+HISTOGRAMS = {stage: Histogram() for stage in STAGES if stage != "callback"}
+CALLBACK_HISTOGRAMS = {}  # device id -> Histogram, written only by that device's callback thread
+
+
+def record(stage, seconds):
+    """Record a GUI thread stage"""
+    HISTOGRAMS[stage].record(seconds)
+
+
+def record_callback(device, seconds):
+    """Record the callback stage from a device's MIDI thread"""
+    histogram = CALLBACK_HISTOGRAMS.get(device)
+    if histogram is None:
+        histogram = CALLBACK_HISTOGRAMS[device] = Histogram()  # Once per device
+    histogram.record(seconds)
+
+
+def stage_histogram(stage):
+    if stage != "callback":
+        return HISTOGRAMS[stage]
+    merged = Histogram()
+    for histogram in list(CALLBACK_HISTOGRAMS.values()):
+        merged.merge(histogram)
+    return merged
+
+
+def report():
+    """Return the histograms as text, one line per stage."""
+    return "\n".join(f"{stage:<13} {stage_histogram(stage).summary()}" for stage in STAGES)
+
+
+def dump():
+    print("MIDI pipeline timings:", file=sys.stderr)
+    print(report(), file=sys.stderr)
+
+
+if ENABLED:
+    atexit.register(dump)
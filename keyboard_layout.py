@@ -0,0 +1,27 @@
+# keyboard_layout.py
+"""
+Lookup tables for all 128 MIDI notes, built once at import.
+
+The per pitch-class values mirror 'NoteCoordinates' and 'NoteFilenames' in theory.pkl.
+Index any table with the MIDI note number, e.g. NOTE_X[60] or NOTE_NAMES[60] == 'C4'.
+"""
+
+# x offset of each pitch class within one octave of keys.png
+PITCH_CLASS_X = (1, 26, 35, 60, 69, 103, 129, 138, 162, 172, 196, 206)
+
+# Highlight image suffix for each pitch class (key shape)
+PITCH_CLASS_FILENAMES = ('_left.png', '_top.png', '_mid.png', '_top.png', '_right.png', '_left.png',
+                         '_top.png', '_mid.png', '_top.png', '_mid.png', '_top.png', '_right.png')
+
+PITCH_CLASS_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+OCTAVE_WIDTH = 239  # Width of one octave in keys.png
+FIRST_OCTAVE = 4  # keys.png starts at the octave containing MIDI note 48
+
+NOTE_COUNT = 128
+
+NOTE_X = tuple(PITCH_CLASS_X[note % 12] + ((note // 12) - FIRST_OCTAVE) * OCTAVE_WIDTH
+               for note in range(NOTE_COUNT))
+NOTE_FILENAMES = tuple(PITCH_CLASS_FILENAMES[note % 12] for note in range(NOTE_COUNT))
+NOTE_NAMES = tuple(f"{PITCH_CLASS_NAMES[note % 12]}{(note // 12) - 1}" for note in range(NOTE_COUNT))
+IS_BLACK = tuple(PITCH_CLASS_FILENAMES[note % 12] == '_top.png' for note in range(NOTE_COUNT))
@@ -0,0 +1,73 @@
+# keyboard_widget.py
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainter
+from PyQt6.QtWidgets import QWidget
+
+from keyboard_layout import NOTE_X, IS_BLACK
+
+
+class PianoKeyboard(QWidget):
+    """
+    Paints the keyboard image with the held keys highlighted.
+
+    The static keys are a single pixmap that is never redrawn into; a note change only marks the
+    key's rectangle dirty. Qt merges every rectangle marked during one pass of the event loop, so a
+    drained batch of note changes becomes one paint that copies back the background and redraws the
+    highlights inside the changed keys only. Clipping to many small rectangles costs more than it
+    saves, so once a batch touches more than MAX_DIRTY_KEYS keys the whole widget is repainted.
+    """
+
+    MAX_DIRTY_KEYS = 8
+
+    def __init__(self, background, parent=None):
+        super().__init__(parent)
+        self.background = background  # The unlit keys, drawn once when the image is loaded
+        # note -> (highlight pixmap, width, height) for held notes. White keys are painted before
+        # black keys so a black key highlight is never covered by its neighbours.
+        self.white_highlights = {}
+        self.black_highlights = {}
+        self.dirty_keys = 0  # Keys marked dirty since the last paint
+        self.setFixedSize(background.size())
+        # Every paint covers its whole dirty region, so Qt does not need to clear it first
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def set_note(self, note, pixmap):
+        """Highlight a key with the given image"""
+        highlights = self.black_highlights if IS_BLACK[note] else self.white_highlights
+        previous = highlights.get(note)
+        if previous is not None:
+            if previous[0] is pixmap:
+                return
+            self.mark_dirty(NOTE_X[note], previous[1], previous[2])
+        width, height = pixmap.width(), pixmap.height()
+        highlights[note] = (pixmap, width, height)
+        self.mark_dirty(NOTE_X[note], width, height)
+
+    def clear_note(self, note):
+        highlight = (self.black_highlights if IS_BLACK[note] else self.white_highlights).pop(note, None)
+        if highlight is not None:
+            self.mark_dirty(NOTE_X[note], highlight[1], highlight[2])
+
+    def clear(self):
+        for note in list(self.white_highlights) + list(self.black_highlights):
+            self.clear_note(note)
+
+    def mark_dirty(self, x, width, height):
+        self.dirty_keys += 1
+        if self.dirty_keys <= self.MAX_DIRTY_KEYS:
+            self.update(x, 0, width, height)
+        elif self.dirty_keys == self.MAX_DIRTY_KEYS + 1:
+            self.update()  # Covers every later key in this batch too
+
+    def paintEvent(self, event):
+        self.dirty_keys = 0
+        bounds = event.rect()
+        left, right = bounds.left(), bounds.right()
+        painter = QPainter(self)  # Clipped to the dirty region by Qt, so only the changed keys are filled
+        painter.drawPixmap(bounds, self.background, bounds)
+        for highlights in (self.white_highlights, self.black_highlights):
+            for note, (pixmap, width, height) in highlights.items():
+                x = NOTE_X[note]
+                if x <= right and x + width > left:
+                    painter.drawPixmap(x, 0, pixmap)
+        painter.end()
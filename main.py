@@ -1,13 +1,15 @@
-from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget
+from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout
+from PyQt6.QtCore import QTimer
 from shared_data_manager import SharedDataManager
-from practical import Practical  # Import the Practical tab class
-from settings import Settings    # Import the Settings tab class
-from midi_handler import MidiHandler
 import sys
 
 class Oralia(QMainWindow):
-    def __init__(self):
+    # Tabs in display order. Each one is only constructed the first time it is shown.
+    TAB_NAMES = ("Practical", "Theory", "Settings")
+
+    def __init__(self, session_dir='sessions'):
         super().__init__()
+        self.session_dir = session_dir  # Where the Practical tab keeps its practice log
         # Initialize SharedDataManager
         self.shared_data_manager = SharedDataManager()
 
@@ -17,28 +19,79 @@ class Oralia(QMainWindow):
         # Now, set the shared data to the shared_data property to ensure any changes are captured
         self._shared_data = self.shared_data_manager.shared_data
         self.tabs = {}
+        self.midi_handler = None
+        self.startup_scheduled = False  # finish_startup has been queued after the first paint
         self.tab_widget = QTabWidget(self)
         self.tab_widget.setTabPosition(QTabWidget.TabPosition.West)
         self.setCentralWidget(self.tab_widget)
 
+        # Add an empty page per tab; the real tab is built into it on first activation
+        for name in self.TAB_NAMES:
+            page = QWidget()
+            layout = QVBoxLayout(page)
+            layout.setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(page, name)
+        self.tab_widget.currentChanged.connect(self.ensure_tab)
+
+        # Only the visible tab is needed for the first frame
+        self.ensure_tab(self.tab_widget.currentIndex())
+
+    def create_tab(self, name):
+        if name == "Practical":
+            from practical import Practical  # Import the Practical tab class
+            return Practical(self, self.shared_data_manager)
+        from settings import Settings  # Import the Settings tab class
+        return Settings(self, self.shared_data_manager)  # Pass shared_data_manager here
+
+    def ensure_tab(self, index):
+        """Construct the tab at index if it has not been shown before"""
+        name = self.TAB_NAMES[index]
+        if name not in self.tabs:
+            self.tabs[name] = self.create_tab(name)
+            self.tab_widget.widget(index).layout().addWidget(self.tabs[name])
+        return self.tabs[name]
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.startup_scheduled:
+            self.startup_scheduled = True
+            # Queued rather than called, so this first frame is finished before the slow work starts
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Deferred until after the first frame: heavy data loads and MIDI device enumeration"""
+        practical = self.ensure_tab(self.TAB_NAMES.index("Practical"))
+        practical.finish_startup(self.session_dir)
+
+        # Importing mido and enumerating ports is slow, so it happens once the window is up
+        from midi_handler import MidiHandler
+        self.midi_handler = MidiHandler(practical)
+        try:
+            self.midi_handler.setup_midi_input()
+        except Exception as e:
+            print(f"MIDI input not started: {e}")
+
+    def closeEvent(self, event):
+        # Release the MIDI port and join the input thread before the window goes away
+        if self.midi_handler:
+            self.midi_handler.stop_midi_input()
+        # Seal and compact this session's practice log
+        practical = self.tabs.get("Practical")
+        if practical is not None and practical.session_log is not None:
+            practical.session_log.close()
+        # Write any settings still waiting in the background writer
+        self.shared_data_manager.close()
+        super().closeEvent(event)
 
-        # Initialize tabs after setting up shared data manager
-        self.tabs["Practical"] = Practical(self,self.shared_data_manager)
-        self.tabs["Theory"] = Settings(self, self.shared_data_manager)  # Pass shared_data_manager here
-        self.tabs["Settings"] = Settings(self, self.shared_data_manager)  # Pass shared_data_manager here
 
-        # Add tabs to the tab widget
-        self.tab_widget.addTab(self.tabs["Practical"], "Practical")
-        self.tab_widget.addTab(self.tabs["Theory"], "Theory")
-        self.tab_widget.addTab(self.tabs["Settings"], "Settings")
+def main():
+    app = QApplication([])
+    window = Oralia()
+    window.show()  # The first paint queues finish_startup
 
-        # Initialize MIDI handler after tabs are created
-        self.midi_handler = MidiHandler(self.tabs["Practical"])
-        self.midi_handler.setup_midi_input()
+    # Start the application event loop
+    sys.exit(app.exec())
 
-app = QApplication([])
-window = Oralia()
-window.show()
 
-# Start the application event loop
-sys.exit(app.exec())
+if __name__ == "__main__":
+    main()
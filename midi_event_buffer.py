@@ -0,0 +1,99 @@
+# midi_event_buffer.py
+from array import array
+import heapq
+import time
+
+# Event type codes stored in the buffer
+NOTE_ON = 1
+NOTE_OFF = 2
+CONTROL_CHANGE = 3  # Stored with the controller number as the note and its value as the velocity
+
+MESSAGE_TYPES = {"note_on": NOTE_ON, "note_off": NOTE_OFF, "control_change": CONTROL_CHANGE}
+
+SUSTAIN_CONTROL = 64  # The only controller the GUI uses; other control changes are not queued
+
+
+class MidiEventBuffer:
+    """
+    Preallocated single-producer/single-consumer ring buffer of MIDI events.
+
+    The MIDI callback thread calls push() and the GUI thread calls drain(). Each side only
+    writes its own index (head for the producer, tail for the consumer), so no lock is needed.
+    Events are kept in parallel arrays (timestamp, type, note, velocity) so pushing allocates nothing.
+    When the buffer is full new events are dropped and counted in `dropped`.
+    Each input device gets its own buffer; `device` tags every event drained from it.
+    """
+
+    def __init__(self, capacity=4096, device=0):
+        # Round up to a power of two so the index wrap is a bit mask
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self.mask = size - 1
+        self.timestamps = array('d', bytes(8 * size))
+        self.types = array('B', bytes(size))
+        self.notes = array('B', bytes(size))
+        self.velocities = array('B', bytes(size))
+        self.head = 0  # Next slot to write, only advanced by the producer
+        self.tail = 0  # Next slot to read, only advanced by the consumer
+        self.dropped = 0
+        self.device = device
+
+    def __len__(self):
+        return self.head - self.tail
+
+    def push(self, event_type, note, velocity, timestamp=None):
+        """Append one event. Returns False if the buffer is full and the event was dropped."""
+        head = self.head
+        if head - self.tail >= self.capacity:
+            self.dropped += 1
+            return False
+        index = head & self.mask
+        self.timestamps[index] = time.perf_counter() if timestamp is None else timestamp
+        self.types[index] = event_type
+        self.notes[index] = note
+        self.velocities[index] = velocity
+        # Publish the slot only after it has been filled
+        self.head = head + 1
+        return True
+
+    def push_message(self, message):
+        """Append a mido message if it is a type the GUI handles."""
+        event_type = MESSAGE_TYPES.get(message.type)
+        if event_type is None:
+            return False
+        if event_type == CONTROL_CHANGE:
+            if message.control != SUSTAIN_CONTROL:
+                return False
+            return self.push(event_type, message.control, message.value)
+        return self.push(event_type, message.note, message.velocity)
+
+    def drain(self, limit=None):
+        """
+        Remove and return the pending events as a list of (timestamp, type, note, velocity, device)
+        tuples, oldest first. At most `limit` events are returned if it is given.
+        """
+        tail = self.tail
+        device = self.device
+        count = self.head - tail
+        if limit is not None and count > limit:
+            count = limit
+        events = []
+        for position in range(tail, tail + count):
+            index = position & self.mask
+            events.append((self.timestamps[index], self.types[index],
+                           self.notes[index], self.velocities[index], device))
+        self.tail = tail + count
+        return events
+
+
+def drain_merged(buffers):
+    """
+    Drain several buffers into one list ordered by timestamp. Each buffer is already in order,
+    so this is a k-way merge rather than a sort.
+    """
+    batches = [buffer.drain() for buffer in buffers if buffer.head != buffer.tail]
+    if len(batches) == 1:
+        return batches[0]
+    return list(heapq.merge(*batches))
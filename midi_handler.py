@@ -1,45 +1,170 @@
+import threading
 import mido
-from PyQt6.QtCore import QThread
+from PyQt6.QtCore import QThread, QTimer
+from midi_event_buffer import MidiEventBuffer, NOTE_OFF, CONTROL_CHANGE, SUSTAIN_CONTROL
+from held_notes import SUSTAIN_THRESHOLD, iter_bits
+import instrumentation
 
 class MidiInputThread(QThread):
-    def __init__(self, practical_tab, input_name):
+    def __init__(self, handler, input_name):
         super().__init__()
-        self.practical_tab = practical_tab
+        self.handler = handler  # Has handle_midi_message, called on mido's callback thread
         self.input_name = input_name
-        self.running = True
+        self.stop_event = threading.Event()
 
     def run(self):
         try:
-            with mido.open_input(self.input_name, callback=self.practical_tab.handle_midi_message) as inport:
+            with mido.open_input(self.input_name, callback=self.handler.handle_midi_message):
                 print(f"MIDI input initialized on {self.input_name}.")
-                while self.running:
-                    pass
+                # mido delivers messages on its own callback thread, so this thread only has to keep
+                # the port open. Block (using no CPU) until stop() sets the event.
+                self.stop_event.wait()
         except Exception as e:
             print(f"Error initializing MIDI input: {e}")
 
     def stop(self):
-        self.running = False
+        self.stop_event.set()
         self.quit()
         self.wait()
 
 
+class MidiDevice:
+    """
+    One open input port. Its mido callback pushes into the device's own event buffer, so every
+    buffer keeps a single producer; the Practical tab merges all device buffers by timestamp.
+    """
+
+    def __init__(self, device_id, input_name):
+        self.device_id = device_id
+        self.input_name = input_name
+        self.events = MidiEventBuffer(device=device_id)
+        self.held_notes = 0  # Notes this device has pressed and not released, only written by the callback
+        self.pedal = False  # This device's sustain pedal is down
+        self.thread = MidiInputThread(self, input_name)
+
+    def handle_midi_message(self, message):
+        """Called on the MIDI thread"""
+        if instrumentation.ENABLED:
+            start = instrumentation.now()
+        if message.type == "note_on" and message.velocity:
+            self.held_notes |= 1 << message.note
+        elif message.type in ("note_on", "note_off"):
+            self.held_notes &= ~(1 << message.note)
+        elif message.type == "control_change" and message.control == SUSTAIN_CONTROL:
+            self.pedal = message.value >= SUSTAIN_THRESHOLD
+        self.events.push_message(message)
+        if instrumentation.ENABLED:
+            instrumentation.record_callback(self.device_id, instrumentation.now() - start)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        """Close the port and queue releases for any held notes and pedal, so nothing stays highlighted"""
+        self.thread.stop()
+        for note in iter_bits(self.held_notes):
+            self.events.push(NOTE_OFF, note, 0)
+        if self.pedal:
+            self.events.push(CONTROL_CHANGE, SUSTAIN_CONTROL, 0)
+        self.held_notes = 0
+        self.pedal = False
+
+
+class MidiDeviceManager:
+    """
+    Opens every available MIDI input (or the ones whose names contain one of `selected`) and
+    polls for devices being plugged in or removed on a GUI timer, so no thread spins waiting.
+    """
+
+    POLL_INTERVAL_MS = 2000
+    MAX_POLL_INTERVAL_MS = 60000  # Polling backs off to this while ports cannot be listed
+    IGNORED_PORTS = ("Midi Through",)  # Loopback ports that never carry a keyboard
+
+    def __init__(self, practical_tab, selected=None):
+        self.practical_tab = practical_tab
+        self.selected = selected
+        self.devices = {}  # input name -> MidiDevice
+        self.device_names = {}  # device id -> input name, kept after disconnects for tagged history
+        self.next_device_id = 1  # 0 tags events that did not come from a device
+        self.available = set()  # Wanted input names seen by the last successful listing
+        self.failed_ports = set()  # Inputs that would not open, retried once the port list changes
+        self.listing_error = None  # Last listing error printed, so it is only reported once
+        self.poll_timer = QTimer()
+        self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.refresh)
+
+    def wanted(self, input_name):
+        if any(ignored in input_name for ignored in self.IGNORED_PORTS):
+            return False
+        return self.selected is None or any(name in input_name for name in self.selected)
+
+    def start(self):
+        self.refresh()
+        self.poll_timer.start()
+
+    def refresh(self):
+        """Open inputs that appeared and close the ones that disappeared or failed"""
+        try:
+            available = {name for name in mido.get_input_names() if self.wanted(name)}
+        except Exception as e:
+            if str(e) != self.listing_error:
+                print(f"Error listing MIDI inputs: {e}")
+                self.listing_error = str(e)
+            self.poll_timer.setInterval(min(self.poll_timer.interval() * 2, self.MAX_POLL_INTERVAL_MS))
+            return
+        if self.listing_error is not None:
+            self.listing_error = None
+            self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+
+        if available != self.available:
+            self.available = available
+            self.failed_ports.clear()  # Something was plugged in or removed, try every port again
+
+        for input_name, device in list(self.devices.items()):
+            if input_name not in available:
+                self.close_device(input_name)
+            elif device.thread.isFinished():  # The port could not be opened or was lost
+                self.failed_ports.add(input_name)
+                self.close_device(input_name, failed=True)
+
+        for input_name in sorted(available - self.devices.keys() - self.failed_ports):
+            self.open_device(input_name)
+
+    def open_device(self, input_name):
+        device = MidiDevice(self.next_device_id, input_name)
+        self.device_names[device.device_id] = input_name
+        self.next_device_id += 1
+        self.devices[input_name] = device
+        self.practical_tab.event_sources.append(device.events)
+        device.start()
+
+    def close_device(self, input_name, failed=False):
+        device = self.devices.pop(input_name)
+        device.stop()
+        if not failed:  # The input thread has already printed why a failed port did not open
+            print(f"MIDI input {input_name} disconnected.")
+        # Apply the queued note_offs before the buffer stops being drained
+        self.practical_tab.drain_midi_events()
+        self.practical_tab.event_sources.remove(device.events)
+
+    def stop(self):
+        self.poll_timer.stop()
+        for input_name in list(self.devices):
+            self.close_device(input_name)
+
+
 class MidiHandler:
     def __init__(self, practical_tab):
         self.practical_tab = practical_tab
-        self.midi_thread = None
-
-    def get_midi_input_name(self):
-        available_inputs = mido.get_input_names()
-        if available_inputs:
-            return available_inputs[0]
-        else:
-            raise Exception("No MIDI input devices found.")
+        self.device_manager = None
 
-    def setup_midi_input(self):
-        input_name = self.get_midi_input_name()
-        self.midi_thread = MidiInputThread(self.practical_tab, input_name)
-        self.midi_thread.start()
+    def setup_midi_input(self, selected=None):
+        """Open all (or the selected) MIDI inputs and keep watching for devices being plugged in"""
+        self.device_manager = MidiDeviceManager(self.practical_tab, selected)
+        self.device_manager.start()
+        if not self.device_manager.devices:
+            print("No MIDI input devices found yet, waiting for one to be connected.")
 
     def stop_midi_input(self):
-        if self.midi_thread:
-            self.midi_thread.stop()
+        if self.device_manager:
+            self.device_manager.stop()
@@ -0,0 +1,292 @@
+# midi_replay.py
+"""
+Headless MIDI replay harness.
+
+Feeds recorded (.mid) or generated event streams through the same path a keyboard uses:
+MidiDevice.handle_midi_message -> the device's event buffer -> drain timer merging every device
+buffer -> note_handler -> insert_note / delete_note, with the GUI on Qt's offscreen platform, and
+reports latency from the moment a message is queued to the moment its key highlight is updated in
+the scene. Each replay connects one or more simulated devices (notes are dealt out by note number,
+the pedal goes to the first one) and disconnects them at the end the way the device manager does,
+so any notes still held are released. Run from the repository root:
+
+    python midi_replay.py recording.mid [more.mid ...]
+    python midi_replay.py --generate scales --speed 4
+    python midi_replay.py --generate chords --flood --track-allocations
+    python midi_replay.py --generate pedal --devices 3
+
+The event loading and generation helpers do not import Qt, so batch tools can reuse them.
+"""
+from collections import namedtuple
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from held_notes import HeldNotes, iter_bits
+from midi_event_buffer import SUSTAIN_CONTROL
+
+# Stand-ins for mido.Message with the attributes the handlers read
+ReplayMessage = namedtuple('ReplayMessage', ['type', 'note', 'velocity'])
+ReplayControl = namedtuple('ReplayControl', ['type', 'control', 'value'])
+
+
+def load_midi_events(path):
+    """Return [(seconds, message), ...] for every message in a .mid file, all tracks merged."""
+    import mido
+
+    events = []
+    elapsed = 0.0
+    for message in mido.MidiFile(path):  # Iterating a MidiFile yields delta times in seconds
+        elapsed += message.time
+        if not message.is_meta:
+            events.append((elapsed, message))
+    return events
+
+
+def generate_scale_events(roots=range(12), spacing=0.08, octaves=2, velocity=80):
+    """Major scales up and down in every root, one note every `spacing` seconds, legato."""
+    steps = [0, 2, 4, 5, 7, 9, 11]
+    events = []
+    elapsed = 0.0
+    for root in roots:
+        run = [48 + root + 12 * octave + step for octave in range(octaves) for step in steps]
+        run.append(48 + root + 12 * octaves)
+        run += run[-2::-1]
+        for note in run:
+            events.append((elapsed, ReplayMessage('note_on', note, velocity)))
+            events.append((elapsed + spacing * 1.1, ReplayMessage('note_off', note, 0)))
+            elapsed += spacing
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def generate_chord_events(roots=range(12), spacing=0.25, velocity=80):
+    """Root-position seventh chords in every root, all notes struck together."""
+    events = []
+    elapsed = 0.0
+    for root in roots:
+        for quality in ((0, 4, 7, 11), (0, 3, 7, 10), (0, 4, 7, 10), (0, 3, 6, 9)):
+            notes = [60 + root + interval for interval in quality]
+            for note in notes:
+                events.append((elapsed, ReplayMessage('note_on', note, velocity)))
+            for note in notes:
+                events.append((elapsed + spacing * 0.9, ReplayMessage('note_off', note, 0)))
+            elapsed += spacing
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def generate_glissando_events(low=21, high=108, spacing=0.004, velocity=90):
+    """A fast glissando over the whole keyboard and back."""
+    notes = list(range(low, high + 1)) + list(range(high - 1, low - 1, -1))
+    events = []
+    for position, note in enumerate(notes):
+        events.append((position * spacing, ReplayMessage('note_on', note, velocity)))
+        events.append((position * spacing + spacing * 2, ReplayMessage('note_off', note, 0)))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def generate_pedal_events(roots=range(12), spacing=0.5, velocity=70):
+    """
+    Broken seventh chords under the sustain pedal, re-pedalled on every chord change. Keys are released
+    with velocity-0 note_ons, as many keyboards send them, while the pedal keeps the chord sounding.
+    """
+    events = []
+    elapsed = 0.0
+    step = spacing / 8
+    for root in roots:
+        notes = [48 + root + interval for interval in (0, 7, 16, 22)]
+        events.append((elapsed, ReplayControl('control_change', SUSTAIN_CONTROL, 127)))
+        for position, note in enumerate(notes):
+            events.append((elapsed + position * step, ReplayMessage('note_on', note, velocity)))
+            events.append((elapsed + (position + 1) * step, ReplayMessage('note_on', note, 0)))
+        elapsed += spacing
+        events.append((elapsed - step / 2, ReplayControl('control_change', SUSTAIN_CONTROL, 0)))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+GENERATORS = {
+    "scales": generate_scale_events,
+    "chords": generate_chord_events,
+    "glissando": generate_glissando_events,
+    "pedal": generate_pedal_events,
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+class ReplayHarness:
+    """Builds a Practical tab on the offscreen platform and replays event streams into it."""
+
+    def __init__(self):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+        from practical import Practical
+
+        self.app = QApplication.instance() or QApplication(sys.argv[:1])
+        self.tab = Practical()
+        self.tab.show()
+        # The practice log goes to a throwaway directory, so a replay never touches the real one
+        self.session_dir = tempfile.mkdtemp(prefix="midi_replay-")
+        self.tab.finish_startup(self.session_dir)
+        self.queued_at = {}  # note -> perf_counter() when its latest message was queued
+        self.latencies = []
+        self.next_device_id = 1
+        # Connected after Practical's own slots, so these run right after insert_note/delete_note
+        self.tab.note_on_signal.connect(self.on_scene_updated)
+        self.tab.note_off_signal.connect(self.on_scene_updated)
+
+    def close(self):
+        """Close the practice log and remove its directory"""
+        self.tab.session_log.close()
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+
+    def connect_devices(self, count):
+        """Simulated input devices whose buffers the tab drains, as MidiDeviceManager.open_device sets them up"""
+        from midi_handler import MidiDevice
+
+        devices = []
+        for _ in range(count):
+            device = MidiDevice(self.next_device_id, f"Replay {self.next_device_id}")  # Its port is never opened
+            self.next_device_id += 1
+            self.tab.event_sources.append(device.events)
+            devices.append(device)
+        return devices
+
+    def disconnect_devices(self, devices):
+        """Queue releases for anything still held and apply them, as MidiDeviceManager.close_device does"""
+        for device in devices:
+            device.stop()
+        self.tab.drain_midi_events()
+        for device in devices:
+            self.tab.event_sources.remove(device.events)
+
+    def on_scene_updated(self, note, *args):
+        queued = self.queued_at.pop(note, None)
+        if queued is not None:
+            self.latencies.append(time.perf_counter() - queued)
+
+    def replay(self, events, speed=1.0, flood=False, track_allocations=False, devices=1):
+        """
+        Replay [(seconds, message), ...] and return a dict of statistics.
+
+        :param speed: Playback speed multiplier for timed replay
+        :param flood: Queue everything as fast as possible instead of following the timestamps
+        :param track_allocations: Trace Python allocations (slows the replay down)
+        :param devices: Number of simulated devices to deal the notes out to
+        """
+        from PyQt6.QtCore import QEventLoop
+
+        inputs = self.connect_devices(devices)
+        buffers = [device.events for device in inputs]
+        if track_allocations:
+            import tracemalloc
+            tracemalloc.start()
+        self.latencies = []
+        self.queued_at.clear()
+        handled = 0
+        blocks_before = sys.getallocatedblocks()
+
+        process_events = self.app.processEvents
+        flags = QEventLoop.ProcessEventsFlag.AllEvents
+        # The tab applies events a frame after they are queued, so its own HeldNotes cannot say yet
+        # which messages will change a highlight. Run the same model over the stream as it is queued.
+        expected = HeldNotes()
+        start = time.perf_counter()
+        position = 0
+        while position < len(events) or any(len(buffer) for buffer in buffers):
+            now = time.perf_counter() - start
+            while position < len(events) and (flood or events[position][0] / speed <= now):
+                message = events[position][1]
+                device = inputs[0] if message.type == 'control_change' else inputs[message.note % devices]
+                queued = time.perf_counter()
+                if message.type == 'note_on' and message.velocity:
+                    expected.note_on(message.note, message.velocity, queued)
+                    self.queued_at[message.note] = queued
+                    handled += 1
+                elif message.type in ('note_on', 'note_off'):
+                    if expected.note_off(message.note):
+                        self.queued_at[message.note] = queued
+                        handled += 1
+                elif message.type == 'control_change' and message.control == SUSTAIN_CONTROL:
+                    for note in iter_bits(expected.sustain(device.device_id, message.value)):
+                        self.queued_at[note] = queued
+                        handled += 1
+                device.handle_midi_message(message)
+                position += 1
+            process_events(flags, 1)
+        process_events(flags, 50)  # Let the last repaint happen
+        elapsed = time.perf_counter() - start
+        if expected.sounding != self.tab.held_notes.sounding:
+            raise RuntimeError("The tab's held notes do not match the replayed stream")
+
+        blocks_after = sys.getallocatedblocks()
+        traced = None
+        if track_allocations:
+            traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.disconnect_devices(inputs)
+
+        latencies = sorted(self.latencies)
+        count = max(handled, 1)
+        return {
+            "events": handled,
+            "seconds": elapsed,
+            "events_per_second": handled / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1e3,
+            "p99_ms": percentile(latencies, 0.99) * 1e3,
+            "max_ms": (latencies[-1] if latencies else 0.0) * 1e3,
+            "net_blocks_per_event": (blocks_after - blocks_before) / count,
+            "traced_peak_bytes_per_event": traced[1] / count if traced else None,
+            "dropped": sum(buffer.dropped for buffer in buffers),
+        }
+
+
+def format_stats(name, stats):
+    line = (f"{name}: {stats['events']} events in {stats['seconds']:.2f} s "
+            f"({stats['events_per_second']:.0f}/s), latency p50 {stats['p50_ms']:.2f} ms "
+            f"p99 {stats['p99_ms']:.2f} ms max {stats['max_ms']:.2f} ms, "
+            f"{stats['net_blocks_per_event']:.2f} net blocks/event")
+    if stats["traced_peak_bytes_per_event"] is not None:
+        line += f", traced peak {stats['traced_peak_bytes_per_event']:.0f} B/event"
+    if stats["dropped"]:
+        line += f", {stats['dropped']} dropped"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay MIDI through the Practical tab without a keyboard.")
+    parser.add_argument("files", nargs="*", help=".mid files to replay")
+    parser.add_argument("--generate", choices=sorted(GENERATORS), action="append", default=[],
+                        help="Replay a generated event stream (can be repeated)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    parser.add_argument("--flood", action="store_true", help="Queue events as fast as possible")
+    parser.add_argument("--track-allocations", action="store_true", help="Trace Python allocations")
+    parser.add_argument("--devices", type=int, default=1, help="Deal the notes out to this many simulated devices")
+    args = parser.parse_args(argv)
+
+    streams = [(path, load_midi_events(path)) for path in args.files]
+    streams += [(name, GENERATORS[name]()) for name in args.generate]
+    if not streams:
+        streams = [(name, generator()) for name, generator in GENERATORS.items()]
+
+    harness = ReplayHarness()
+    try:
+        for name, events in streams:
+            print(format_stats(name, harness.replay(events, args.speed, args.flood, args.track_allocations,
+                                                      args.devices)))
+    finally:
+        harness.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,84 @@
+from midi_event_buffer import NOTE_ON, NOTE_OFF, CONTROL_CHANGE, SUSTAIN_CONTROL, MESSAGE_TYPES
+from keyboard_layout import NOTE_NAMES
+from held_notes import iter_bits
+
+
 def note_handler(tab_instance, message):
     """
-    Handles MIDI messages and prints the note if it is a 'note_on' or 'note_off' message.
+    Handles a single MIDI message if it is a 'note_on', 'note_off' or sustain pedal message.
     Also updates the 'inversion_label' based on the pressed note.
+    Must be called on the GUI thread; the MIDI thread should push into the tab's event buffer instead.
     """
-    if message.type == "note_on":
-        # Get the note name from the MIDI note number
-        note_name = midi_note_to_name(message.note)
+    event_type = MESSAGE_TYPES.get(message.type)
+    if event_type == CONTROL_CHANGE:
+        handle_note_events(tab_instance, [(0.0, event_type, message.control, message.value, 0)])
+    elif event_type is not None:
+        handle_note_events(tab_instance, [(0.0, event_type, message.note, message.velocity, 0)])
 
-        # Update the inversion label with the pressed note
-        tab_instance.labels['inversion_label'].setText(f"Inversion: {note_name}")
-        print(f"Note On: {message.note} ({note_name})")
 
-        # Emit the note_on_signal to indicate that a note has been pressed
-        tab_instance.note_on_signal.emit(message.note, "green")  # Emit with "green" color for the note
+def release_note(tab_instance, grader, note):
+    """A note stopped sounding: let go of it in the grader and remove its highlight"""
+    if grader is not None:
+        grader.note_off(note)
+    # Emit the note_off_signal to indicate that a note has been released
+    tab_instance.note_off_signal.emit(note)  # Emit note_off_signal to handle note release
 
-    elif message.type == "note_off":
-        # Get the note name from the MIDI note number
-        note_name = midi_note_to_name(message.note)
 
-        # Update the inversion label with the released note (or reset to a default value)
+def handle_note_events(tab_instance, events):
+    """
+    Handles a batch of (timestamp, type, note, velocity, device) events drained from the MIDI event buffers.
+    Key highlights and the tab's HeldNotes are updated for every event, but the 'inversion_label'
+    is only set once per batch: to the recognized chord if the sounding notes form one, otherwise to
+    the most recently pressed note. Notes are also fed to the tab's exercise grader, if one is running,
+    and a finished drill moves straight on to the next one.
+
+    A note_on with velocity 0 is a note_off. Notes released while a sustain pedal is down keep
+    sounding, and stay highlighted and held for grading, until every pedal that was down then has
+    been lifted. Each device's pedal only releases the notes it holds itself.
+    """
+    last_note_on = None
+    held_notes = tab_instance.held_notes
+    grader = tab_instance.grader
+    for timestamp, event_type, note, velocity, device in events:
+        if event_type == NOTE_ON and velocity:
+            last_note_on = note
+            held_notes.note_on(note, velocity, timestamp)
+            if grader is not None and not grader.finished:
+                exercise = grader.current_exercise
+                correct = grader.note_on(note, timestamp)
+                if tab_instance.session_log is not None:
+                    tab_instance.session_log.append(exercise.name, note, velocity, correct)
+            # Emit the note_on_signal to indicate that a note has been pressed
+            tab_instance.note_on_signal.emit(note, "green")  # Emit with "green" color for the note
 
+        elif event_type == NOTE_OFF or event_type == NOTE_ON:
+            if held_notes.note_off(note):
+                release_note(tab_instance, grader, note)
 
-        # Emit the note_off_signal to indicate that a note has been released
-        tab_instance.note_off_signal.emit(message.note)  # Emit note_off_signal to handle note release
+        elif event_type == CONTROL_CHANGE and note == SUSTAIN_CONTROL:
+            for released in iter_bits(held_notes.sustain(device, velocity)):
+                release_note(tab_instance, grader, released)
+
+    chord_index = tab_instance.chord_index
+    matches = chord_index.identify_bits(held_notes.sounding) if chord_index is not None else ()
+    if matches:
+        name, inversion = matches[0]
+        tab_instance.labels['inversion_label'].setText(f"Inversion: {name} {inversion}".rstrip())
+    elif last_note_on is not None:
+        # Update the inversion label with the most recently pressed note
+        tab_instance.labels['inversion_label'].setText(f"Inversion: {NOTE_NAMES[last_note_on]}")
+
+    if grader is not None and events:
+        if tab_instance.session_log is not None:
+            tab_instance.session_log.flush()
+        if grader.finished and tab_instance.drills is not None:
+            tab_instance.next_drill()  # Move straight on to the next drill
+        else:
+            tab_instance.update_exercise_labels()
 
 
 def midi_note_to_name(note):
     """
     Converts a MIDI note number to a note name (e.g., 60 -> 'C4').
     """
-    # List of note names, starting from C
-    notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    octave = (note // 12) - 1  # The octave is calculated by dividing the note by 12 and adjusting
-    note_name = notes[note % 12]
-    return f"{note_name}{octave}"
-
-
-# Example usage:
-note_number = 60  # This is C4
-note_name = midi_note_to_name(note_number)
-print(note_name)  # Output: C4
+    return NOTE_NAMES[note]
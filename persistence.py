@@ -0,0 +1,120 @@
+# persistence.py
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+
+def atomic_write(path, data):
+    """
+    Write bytes to path so that readers only ever see the old or the new contents:
+    write a temporary file in the same directory, fsync it, then rename it over the target.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    # Make the rename itself durable where the platform allows opening directories
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class WriteBehindWriter:
+    """
+    Persists snapshots of a value on a background thread.
+
+    save() only records the latest snapshot and returns immediately. The worker waits until no new
+    snapshot has arrived for `delay` seconds (or `max_delay` seconds have passed since the first
+    pending one), then pickles and atomically writes only the newest snapshot, so a burst of
+    changes costs a single write. flush() blocks until everything saved so far is on disk.
+    """
+
+    def __init__(self, path, delay=0.25, max_delay=2.0):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.writes = 0  # Number of files written, useful to see how well saves were coalesced
+        self._condition = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._pending_since = None
+        self._last_save = None
+        self._writing = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="WriteBehindWriter", daemon=True)
+        self._thread.start()
+
+    def save(self, snapshot):
+        """Schedule a snapshot to be written. The caller must not mutate it afterwards."""
+        with self._condition:
+            now = time.monotonic()
+            if not self._has_pending:
+                self._pending_since = now
+            self._pending = snapshot
+            self._has_pending = True
+            self._last_save = now
+            self._condition.notify_all()
+
+    def flush(self):
+        """Block until every snapshot saved so far has been written."""
+        with self._condition:
+            self._pending_since = 0.0  # Write immediately
+            self._condition.notify_all()
+            while self._has_pending or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        """Flush pending data and stop the worker thread."""
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._has_pending and not self._closed:
+                    self._condition.wait()
+                if not self._has_pending:
+                    return
+                # Coalesce: wait for a quiet period, but never longer than max_delay overall
+                while True:
+                    now = time.monotonic()
+                    deadline = min(self._last_save + self.delay, self._pending_since + self.max_delay)
+                    if now >= deadline or self._closed:
+                        break
+                    self._condition.wait(deadline - now)
+                snapshot = self._pending
+                self._pending = None
+                self._has_pending = False
+                self._writing = True
+
+            try:
+                atomic_write(self.path, pickle.dumps(snapshot))
+                self.writes += 1
+            except Exception as e:
+                print(f"Error saving {self.path}: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
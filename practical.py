@@ -1,10 +1,34 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QListWidget, \
-    QGraphicsScene, QGraphicsView, QGraphicsPixmapItem, QAbstractItemView
-from PyQt6.QtCore import pyqtSignal, Qt
-from PyQt6.QtGui import QPixmap, QFont
-from note_handler import note_handler  # Importing the note_handler function
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QListWidget, QAbstractItemView
+from PyQt6.QtCore import pyqtSignal, QTimer, QObject, QEvent
+from PyQt6.QtGui import QFont
+from note_handler import handle_note_events  # Importing the batched note handler
+from midi_event_buffer import drain_merged
+from keyboard_layout import NOTE_FILENAMES
+from keyboard_widget import PianoKeyboard
+from assets import AssetManager
+from held_notes import HeldNotes
 from theory_handler import handle_theory_action  # Import the function from theory_handler
-import pickle
+from drill_scheduler import DrillScheduler, drill_pool
+from theory_store import TheoryStore
+from chord_index import ChordIndex
+from session_log import SessionLog
+import instrumentation
+
+KEY_COLORS = ("green",)  # Highlight colors whose key images are preloaded at startup
+
+
+class FrameTimer(QObject):
+    """Event filter that records, on the next paint, how long ago the oldest drained event was queued"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.oldest_queued = None  # Timestamp of the oldest event applied since the last paint
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and self.oldest_queued is not None:
+            instrumentation.record("frame", instrumentation.now() - self.oldest_queued)
+            self.oldest_queued = None
+        return False
 
 
 class Practical(QWidget):
@@ -12,12 +36,22 @@ class Practical(QWidget):
     note_on_signal = pyqtSignal(int, str)
     note_off_signal = pyqtSignal(int)
 
+    # How often queued MIDI events are applied to the GUI (about one frame at 60 Hz)
+    MIDI_DRAIN_INTERVAL_MS = 16
+
     def __init__(self, parent=None, shared_data_manager=None):
         super().__init__(parent)
         self.shared_data_manager = shared_data_manager  # Store the shared data manager
-        self.pixmap_item = {}
+        self.assets = AssetManager()  # Key images, all cut from one atlas file
+        self.event_sources = []  # Every buffer drained per frame, one per input device
+        self.held_notes = HeldNotes()  # Pressed and pedal-sustained notes, with their velocities
+        self.theorymode = None
+        self.grader = None  # ExerciseGrader for the drill being played
+        self.drills = None  # DrillScheduler over the selection the Go button was pressed with
+        self.session_log = None  # SessionLog every graded note is appended to, opened by finish_startup
 
         self.load_theory()
+        self.chord_index = None  # ChordIndex recognizing the sounding notes, built by finish_startup
 
         # Setup the GUI
         self.setup_layout()
@@ -28,12 +62,18 @@ class Practical(QWidget):
 
         # Connect signals to methods
         self.connect_signals()
+        self.setup_midi_drain_timer()
+
+    def finish_startup(self, session_dir='sessions'):
+        """Work that is not needed for the first frame; the main window calls this once it is shown"""
+        self.chord_index = ChordIndex(self.Theory)
+        self.session_log = SessionLog(session_dir)  # Opening compacts earlier sessions
+        self.load_key_pixmaps()
 
     def load_theory(self):
-        """Load theory from pickle file"""
+        """Open the compiled theory store; sections are decoded on first access"""
         try:
-            with open('theory.pkl', 'rb') as file:
-                self.Theory = pickle.load(file)
+            self.Theory = TheoryStore('theory.bin')
             print("Theory loaded from file")
         except FileNotFoundError:
             self.Theory = {}  # Default empty dictionary if file is not found
@@ -58,19 +98,25 @@ class Practical(QWidget):
         self.theory2.setSelectionMode(QAbstractItemView.SelectionMode.MultiSelection)
 
     def setup_piano_keys_view(self):
-        """Setup the QGraphicsView for piano keys"""
-        self.Scene = QGraphicsScene()
-        self.BackgroundPixmap = QPixmap(
-            "/Users/williamcorney/PycharmProjects/JazzPiano2/Practical/Images/Piano/keys.png")
-        self.BackgroundItem = QGraphicsPixmapItem(self.BackgroundPixmap)
-        self.Scene.addItem(self.BackgroundItem)
-
-        self.View = QGraphicsView(self.Scene)
-        self.View.setFixedSize(self.BackgroundPixmap.size())
-        self.View.setSceneRect(0, 0, self.BackgroundPixmap.width(), self.BackgroundPixmap.height())
-        self.View.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.View.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.layout.addWidget(self.View)
+        """Setup the keyboard widget, which repaints only the keys whose highlight changed"""
+        self.BackgroundPixmap = self.assets.background()
+        self.keyboard = PianoKeyboard(self.BackgroundPixmap)
+        self.layout.addWidget(self.keyboard)
+
+        self.frame_timer = None
+        if instrumentation.ENABLED:
+            self.frame_timer = FrameTimer(self)
+            self.keyboard.installEventFilter(self.frame_timer)
+
+    def load_key_pixmaps(self):
+        """Cut every key highlight out of the atlas once so pressing a key does no image work"""
+        for color in KEY_COLORS:
+            for filename in set(NOTE_FILENAMES):
+                self.key_pixmap(color, filename)
+
+    def key_pixmap(self, color, filename):
+        """Return the cached highlight pixmap for a color and key shape"""
+        return self.assets.highlight(color, filename)
 
     def setup_labels(self):
         """Setup the labels on the GUI"""
@@ -105,6 +151,13 @@ class Practical(QWidget):
         self.theory2.itemClicked.connect(self.theory2_clicked)
         self.theory3.itemClicked.connect(self.theory3_clicked)
 
+    def setup_midi_drain_timer(self):
+        """Apply queued MIDI events in one batch per frame instead of one signal per message"""
+        self.midi_drain_timer = QTimer(self)
+        self.midi_drain_timer.setInterval(self.MIDI_DRAIN_INTERVAL_MS)
+        self.midi_drain_timer.timeout.connect(self.drain_midi_events)
+        self.midi_drain_timer.start()
+
     def theory1_clicked(self):
         self.labels['score_value'].setText("")
         self.labels['fingering_label'].clear()
@@ -151,30 +204,64 @@ class Practical(QWidget):
         """
         Insert a note (visual representation) on the piano keyboard at the given position.
         """
-        self.xcord = self.Theory["NoteCoordinates"][note % 12] + ((note // 12) - 4) * 239
-        self.pixmap_item[note] = QGraphicsPixmapItem(
-            QPixmap("/Users/williamcorney/PycharmProjects/JazzPiano2/Practical/Images/Piano/key_" + color +
-                    self.Theory["NoteFilenames"][note % 12]))
-        self.pixmap_item[note].setPos(self.xcord, 0)
-        current_scene = self.pixmap_item[note].scene()
-        if current_scene:
-            current_scene.removeItem(self.pixmap_item[note])
-        self.Scene.addItem(self.pixmap_item[note])
+        if instrumentation.ENABLED:
+            start = instrumentation.now()
+        self.keyboard.set_note(note, self.key_pixmap(color, NOTE_FILENAMES[note]))
+        if instrumentation.ENABLED:
+            instrumentation.record("insert_note", instrumentation.now() - start)
 
     def delete_note(self, note):
-        if note in self.pixmap_item:
-            if self.pixmap_item[note].scene():
-                self.pixmap_item[note].scene().removeItem(self.pixmap_item[note])
-            del self.pixmap_item[note]
+        if instrumentation.ENABLED:
+            start = instrumentation.now()
+        self.keyboard.clear_note(note)
+        if instrumentation.ENABLED:
+            instrumentation.record("delete_note", instrumentation.now() - start)
 
-    def handle_midi_message(self, message):
-        note_handler(self, message)  # Pass self (Practical instance) and the MIDI message
+    def drain_midi_events(self):
+        """Called by the drain timer on the GUI thread"""
+        events = drain_merged(self.event_sources)
+        if events:
+            if instrumentation.ENABLED:
+                self.record_drain_timings(events)
+            else:
+                handle_note_events(self, events)
+
+    def record_drain_timings(self, events):
+        """Instrumented version of the drain: queue wait per event, handler time per batch"""
+        start = instrumentation.now()
+        for event in events:
+            instrumentation.record("queue", start - event[0])
+        if self.frame_timer.oldest_queued is None:
+            self.frame_timer.oldest_queued = events[0][0]
+        handle_note_events(self, events)
+        instrumentation.record("note_handler", instrumentation.now() - start)
 
     def go_button_clicked(self):
-        """Handle the action when the Go button is clicked"""
+        """Start drilling the selection: every key, selected item and selected variant, in weighted random order"""
         selected_items = [item.text() for item in self.theory2.selectedItems()]
-        self.theorymode = "Scales"
-        if self.theorymode:
-            # Call the function from theory_handler and pass the shared data manager
-            result = handle_theory_action(self.theorymode, selected_items, self.shared_data_manager)
-            print(result)  # Print or update UI based on result
+        variants = [item.text() for item in self.theory3.selectedItems()]
+        if self.theorymode and selected_items and self.Theory:
+            self.drills = DrillScheduler(drill_pool(self.Theory, self.theorymode, selected_items, variants),
+                                         self.session_log)
+            self.next_drill()
+
+    def next_drill(self):
+        """Record the finished drill, if any, and start the one the scheduler picks next"""
+        if self.grader is not None and self.grader.finished:
+            self.drills.record(self.grader.summary())
+        drill = self.drills.next()
+        # Call the function from theory_handler to build the drill's exercise
+        self.grader = handle_theory_action(drill.theory_mode, [drill.item], self.Theory,
+                                           [drill.variant] if drill.variant else (), drill.root)
+        self.update_exercise_labels()
+
+    def update_exercise_labels(self):
+        """Show the current exercise, expected finger and running score"""
+        grader = self.grader
+        if grader is None:
+            return
+        exercise = grader.current_exercise
+        self.labels['key_label'].setText(exercise.name if exercise else "Done")
+        finger = grader.expected_finger
+        self.labels['fingering_label'].setText(f"Fingering: {finger}" if finger else "")
+        self.labels['score_value'].setText(f"Score: {grader.score}  Streak: {grader.streak}")
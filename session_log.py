@@ -0,0 +1,203 @@
+# session_log.py
+"""
+Append-only log of practice attempts with compaction into per-exercise aggregates.
+
+Every graded note is appended as a small length-prefixed record to the current segment file
+(sessions/segment-00000001.log, ...). Segments are rotated once they reach a size limit, and
+sealed segments are periodically folded into sessions/aggregates.json and deleted. Queries only
+read the aggregates plus running totals of what this process has appended since, so they never
+replay history.
+
+Record layout (little endian):
+    u16  payload length
+    f64  timestamp (seconds since the epoch)
+    u8   note
+    u8   velocity
+    u8   correct flag
+    ...  exercise id (UTF-8, rest of the payload)
+"""
+import json
+import os
+import struct
+import time
+
+from persistence import atomic_write
+
+_LENGTH = struct.Struct("<H")
+_RECORD = struct.Struct("<dBBB")
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+AGGREGATES_FILE = "aggregates.json"
+
+
+def new_aggregate():
+    return {"attempts": 0, "correct": 0, "velocity_sum": 0, "first": None, "last": None}
+
+
+def add_to_aggregate(aggregate, timestamp, velocity, correct):
+    aggregate["attempts"] += 1
+    aggregate["correct"] += 1 if correct else 0
+    aggregate["velocity_sum"] += velocity
+    if aggregate["first"] is None or timestamp < aggregate["first"]:
+        aggregate["first"] = timestamp
+    if aggregate["last"] is None or timestamp > aggregate["last"]:
+        aggregate["last"] = timestamp
+
+
+def merge_aggregates(target, source):
+    target["attempts"] += source["attempts"]
+    target["correct"] += source["correct"]
+    target["velocity_sum"] += source["velocity_sum"]
+    for key, pick in (("first", min), ("last", max)):
+        if source[key] is not None:
+            target[key] = source[key] if target[key] is None else pick(target[key], source[key])
+
+
+def read_segment(path):
+    """
+    Yield (timestamp, exercise_id, note, velocity, correct) records from a segment file.
+    A record cut short by a crash at the end of the file is ignored.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    offset = 0
+    while offset + _LENGTH.size <= len(data):
+        length = _LENGTH.unpack_from(data, offset)[0]
+        start = offset + _LENGTH.size
+        if length < _RECORD.size or start + length > len(data):
+            break
+        timestamp, note, velocity, correct = _RECORD.unpack_from(data, start)
+        exercise_id = data[start + _RECORD.size:start + length].decode("utf-8")
+        yield timestamp, exercise_id, note, velocity, bool(correct)
+        offset = start + length
+
+
+class SessionLog:
+    """
+    Segmented practice log for one directory.
+
+    Opening a log compacts whatever earlier sessions left behind and starts a fresh segment.
+    """
+
+    def __init__(self, directory="sessions", segment_size=1 << 20, compact_after=4):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.compact_after = compact_after  # Compact once this many sealed segments have piled up
+        os.makedirs(directory, exist_ok=True)
+
+        self.aggregates = {}  # Compacted totals per exercise id
+        self.compacted_through = 0  # Highest segment number folded into self.aggregates
+        self.load_aggregates()
+        self.pending = {}  # Totals for records appended by this process and not yet compacted
+
+        self.segment_number = max(self.segment_numbers(), default=self.compacted_through) + 1
+        self.compact()
+        self.file = None
+        self.open_segment()
+
+    def segment_path(self, number):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:08d}{SEGMENT_SUFFIX}")
+
+    def segment_numbers(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    pass
+        return sorted(numbers)
+
+    def load_aggregates(self):
+        try:
+            with open(os.path.join(self.directory, AGGREGATES_FILE), encoding="utf-8") as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            return
+        self.aggregates = stored.get("exercises", {})
+        self.compacted_through = stored.get("compacted_through", 0)
+
+    def open_segment(self):
+        self.file = open(self.segment_path(self.segment_number), "ab")
+
+    def append(self, exercise_id, note, velocity, correct, timestamp=None):
+        """Append one graded note."""
+        if timestamp is None:
+            timestamp = time.time()
+        name = exercise_id.encode("utf-8")
+        self.file.write(_LENGTH.pack(_RECORD.size + len(name)))
+        self.file.write(_RECORD.pack(timestamp, note, velocity, 1 if correct else 0))
+        self.file.write(name)
+
+        aggregate = self.pending.get(exercise_id)
+        if aggregate is None:
+            aggregate = self.pending[exercise_id] = new_aggregate()
+        add_to_aggregate(aggregate, timestamp, velocity, correct)
+
+        if self.file.tell() >= self.segment_size:
+            self.rotate()
+
+    def flush(self):
+        """Push buffered records to the operating system."""
+        self.file.flush()
+
+    def rotate(self):
+        """Seal the current segment and start a new one, compacting if enough segments are sealed."""
+        self.file.close()
+        self.segment_number += 1
+        self.open_segment()
+        if len(self.segment_numbers()) - 1 >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Fold every sealed segment into the aggregates file and delete the segments."""
+        sealed = [number for number in self.segment_numbers() if number < self.segment_number]
+        if not sealed:
+            return
+        folded = [number for number in sealed if number > self.compacted_through]
+        for number in folded:
+            for timestamp, exercise_id, note, velocity, correct in read_segment(self.segment_path(number)):
+                aggregate = self.aggregates.get(exercise_id)
+                if aggregate is None:
+                    aggregate = self.aggregates[exercise_id] = new_aggregate()
+                add_to_aggregate(aggregate, timestamp, velocity, correct)
+        if folded:
+            self.compacted_through = max(folded)
+            payload = {"compacted_through": self.compacted_through, "exercises": self.aggregates}
+            atomic_write(os.path.join(self.directory, AGGREGATES_FILE),
+                         json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+            # Only sealed segments are compacted and a fresh segment is opened right after sealing,
+            # so everything this process appended is now in the aggregates
+            self.pending = {}
+        # Segments at or below compacted_through are in the aggregates, even if a crash left them behind
+        for number in sealed:
+            try:
+                os.unlink(self.segment_path(number))
+            except OSError:
+                pass
+
+    def stats(self, exercise_id):
+        """Return the totals for one exercise, or None if it has never been attempted."""
+        compacted = self.aggregates.get(exercise_id)
+        pending = self.pending.get(exercise_id)
+        if compacted is None and pending is None:
+            return None
+        result = new_aggregate()
+        for aggregate in (compacted, pending):
+            if aggregate is not None:
+                merge_aggregates(result, aggregate)
+        return result
+
+    def all_stats(self):
+        """Return the totals for every exercise ever attempted."""
+        return {exercise_id: self.stats(exercise_id) for exercise_id in set(self.aggregates) | set(self.pending)}
+
+    def close(self):
+        """Seal the current segment and compact everything."""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        self.segment_number += 1
+        self.compact()
@@ -38,7 +38,7 @@ class Settings(QWidget):
         self.layout.addWidget(self.delete_button)
 
         # Connect the signal to update the label when shared data changes
-        self.shared_data_manager.data_updated.connect(self.update_label)  # Listen to data_updated signal
+        self.shared_data_manager.keys_changed.connect(self.on_keys_changed)  # Only the touched keys
 
         # Set the layout
         self.setLayout(self.layout)
@@ -66,21 +66,23 @@ class Settings(QWidget):
         key = self.key_input.text()
 
         if key in self.shared_data_manager.shared_data:  # Access shared data via shared_data_manager
-            del self.shared_data_manager.shared_data[key]  # Delete the key from the dictionary
-            self.shared_data_manager.trigger_data_update()  # Trigger update
+            self.shared_data_manager.delete_value(key)  # Saves and notifies observers once
             self.testkey_label.setText(f"Key '{key}' deleted.")
         else:
             self.testkey_label.setText(f"Key '{key}' not found.")
 
     def set_value(self, key, value):
-        data = self.shared_data_manager.shared_data  # Access shared data via shared_data_manager
-        data[key] = value
-        self.shared_data_manager.trigger_data_update()  # Trigger update
-        self.shared_data_manager.shared_data = data  # This triggers data_updated signal
+        self.shared_data_manager.set_value(key, value)  # Saves and notifies observers once
 
     def get_value(self, key):
         return self.shared_data_manager.shared_data.get(key)  # Access shared data via shared_data_manager
 
+    def on_keys_changed(self, change_set):
+        # Only refresh when the key being displayed was touched
+        key = self.key_input.text()
+        if key and (key in change_set.added or key in change_set.changed or key in change_set.removed):
+            self.update_label(self.shared_data_manager.shared_data)
+
     def update_label(self, updated_data):
         # Update label when shared data is updated
         key = self.key_input.text()
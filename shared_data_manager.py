@@ -1,13 +1,30 @@
 # shared_data_manager.py
+from collections import namedtuple
+from contextlib import contextmanager
 from PyQt6.QtCore import QObject, pyqtSignal
+from persistence import WriteBehindWriter
 import pickle
 
+# Keys touched by one committed change, each a frozenset
+ChangeSet = namedtuple('ChangeSet', ['added', 'changed', 'removed'])
+
+_MISSING = object()
+
+
 class SharedDataManager(QObject):
-    data_updated = pyqtSignal(dict)
+    data_updated = pyqtSignal(dict)  # Whole dictionary, emitted once per commit (kept for compatibility)
+    keys_changed = pyqtSignal(object)  # ChangeSet, emitted once per commit that changed something
 
     def __init__(self):
         super().__init__()
         self._shared_data = {}
+        self._committed = {}  # Shallow copy of the data as of the last commit, used to diff reassignments
+        self._subscribers = {}  # key -> list of callbacks(key, value)
+        self._transaction_depth = 0
+        self._pending_changes = {}  # key -> value before the open transaction first touched it
+        self._reassigned = False  # The whole dictionary was assigned during the open transaction
+        # Coalesces bursts of changes and writes them atomically on a background thread
+        self._writer = WriteBehindWriter('shared_data.pkl')
 
     def load_data(self):
         """
@@ -23,19 +40,28 @@ class SharedDataManager(QObject):
         except Exception as e:
             print(f"Error loading shared data: {e}")
 
+        self._committed = dict(self._shared_data)
         return self._shared_data
 
     def save_data(self, data):
         """
-        Save shared data to file (using pickle).
+        Schedule shared data to be saved to file (using pickle).
+        Returns immediately; the write happens on a background thread once changes settle.
         """
-        try:
-            with open('shared_data.pkl', 'wb') as file:
-                pickle.dump(data, file)
-            print("Shared data saved to file")
-            self.data_updated.emit(data)  # Emit signal after saving
-        except Exception as e:
-            print(f"Error saving shared data: {e}")
+        # Snapshot the top level so later edits on the GUI thread can't race the writer
+        self._writer.save(dict(data))
+
+    def flush(self):
+        """
+        Block until all scheduled saves are on disk. Call before the application exits.
+        """
+        self._writer.flush()
+
+    def close(self):
+        """
+        Flush pending saves and stop the background writer.
+        """
+        self._writer.close()
 
     @property
     def shared_data(self):
@@ -43,9 +69,18 @@ class SharedDataManager(QObject):
 
     @shared_data.setter
     def shared_data(self, value):
-        self._shared_data = value
-        self.save_data(value)  # Save updated data
-        self.data_updated.emit(value)  # Emit the signal when data is updated
+        # Whole-dictionary assignment: diff against the last commit to find the touched keys.
+        # Values mutated in place compare equal to themselves, so a reassignment is always saved
+        # and announced on data_updated even when no key-level change is found.
+        with self.transaction():
+            self._reassigned = True
+            committed = self._committed
+            for key in committed.keys() | value.keys():
+                old = committed.get(key, _MISSING)
+                new = value.get(key, _MISSING)
+                if old is _MISSING or new is _MISSING or old != new:
+                    self._pending_changes.setdefault(key, old)
+            self._shared_data = value
 
     def trigger_data_update(self):
         """
@@ -53,3 +88,78 @@ class SharedDataManager(QObject):
         without directly modifying the shared data.
         """
         self.data_updated.emit(self._shared_data)
+
+    def subscribe(self, key, callback):
+        """
+        Call callback(key, value) after every commit that adds, changes or removes key.
+        value is None when the key was removed.
+        """
+        self._subscribers.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key, callback):
+        callbacks = self._subscribers.get(key)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[key]
+
+    def set_value(self, key, value):
+        """Set one key. Saves and notifies on commit (immediately outside a transaction)."""
+        with self.transaction():
+            self._pending_changes.setdefault(key, self._committed.get(key, _MISSING))
+            self._shared_data[key] = value
+
+    def delete_value(self, key):
+        """Remove one key if present. Saves and notifies on commit."""
+        if key not in self._shared_data:
+            return
+        with self.transaction():
+            self._pending_changes.setdefault(key, self._committed.get(key, _MISSING))
+            del self._shared_data[key]
+
+    def update_values(self, values):
+        """Set several keys in a single commit."""
+        with self.transaction():
+            for key, value in values.items():
+                self.set_value(key, value)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes so they are saved once and observers are notified once, when the
+        outermost transaction exits.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._commit()
+
+    def _commit(self):
+        pending, self._pending_changes = self._pending_changes, {}
+        reassigned, self._reassigned = self._reassigned, False
+        added, changed, removed = set(), set(), set()
+        for key, old in pending.items():
+            new = self._shared_data.get(key, _MISSING)
+            if old is _MISSING and new is not _MISSING:
+                added.add(key)
+                self._committed[key] = new
+            elif new is _MISSING and old is not _MISSING:
+                removed.add(key)
+                del self._committed[key]
+            elif new is not _MISSING and old != new:
+                changed.add(key)
+                self._committed[key] = new
+        if not (added or changed or removed or reassigned):
+            return
+
+        self.save_data(self._shared_data)  # Schedule a save of the updated data
+        self.data_updated.emit(self._shared_data)  # Emit the signal once when data is updated
+        if not (added or changed or removed):
+            return
+        self.keys_changed.emit(ChangeSet(frozenset(added), frozenset(changed), frozenset(removed)))
+        for key in added | changed | removed:
+            for callback in list(self._subscribers.get(key, ())):
+                callback(key, self._shared_data.get(key))
@@ -0,0 +1,151 @@
+# theory_generator.py
+"""
+Generate the transposed theory tables from interval templates.
+
+Scales, Triads, Sevenths, Modes and Shells are all a small set of interval templates transposed
+to every key. Each table is built with one NumPy broadcast (roots x templates x inversions x notes)
+and then converted into the nested dicts and lists that Practical, the grader and the chord index
+read from the theory store, in the same key order as theory.pkl. Adding a chord quality is one new
+template line.
+
+Fingering, note coordinates, key signatures and the other hand-entered sections cannot be derived
+from intervals, so generate_theory() copies them from an existing theory store or pickle.
+
+Only needed at build time. Regenerate theory.bin with:
+
+    python theory_generator.py [base theory.bin or .pkl] [output theory.bin]
+"""
+import sys
+
+import numpy as np
+
+from theory_store import TheoryStore, compile_theory
+
+KEY_NAMES = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B')
+ROOTS = np.arange(12)
+
+SCALE_TEMPLATES = {
+    "Major": (0, 2, 4, 5, 7, 9, 11, 12),
+    "Minor": (0, 2, 3, 5, 7, 8, 10, 12),
+    "Melodic Minor": (0, 2, 3, 5, 7, 9, 11, 12),
+    "Harmonic Minor": (0, 2, 3, 5, 7, 8, 11, 12),
+}
+
+TRIAD_TEMPLATES = {
+    "Major": (0, 4, 7),
+    "Minor": (0, 3, 7),
+}
+
+SEVENTH_TEMPLATES = {
+    "Maj7": (0, 4, 7, 11),
+    "Min7": (0, 3, 7, 10),
+    "7": (0, 4, 7, 10),
+    "Dim7": (0, 3, 6, 9),
+    "m7f5": (0, 3, 6, 10),
+}
+
+INVERSION_NAMES = ("Root", "First", "Second", "Third")
+
+MODE_NAMES = ("Ionian", "Dorian", "Phrygian", "Lydian", "Mixolydian", "Aeolian", "Locrian")
+
+# Shell voicings are two notes (3rd and 7th) above middle C; index 0 is '3/7' and 1 is '7/3'
+SHELL_TEMPLATES = {
+    "Major": ((4, 11), (16, 11)),
+    "Minor": ((3, 10), (10, 15)),
+    "Dominant": ((4, 10), (10, 16)),
+}
+SHELL_BASE = 60
+# Shell tables also list the sharp spellings of the two keys usually written either way
+SHELL_KEYS = (("C", 0), ("C#", 1), ("Db", 1), ("D", 2), ("Eb", 3), ("E", 4), ("F", 5),
+              ("F#", 6), ("Gb", 6), ("G", 7), ("Ab", 8), ("A", 9), ("Bb", 10), ("B", 11))
+
+
+def transpose(templates, roots=ROOTS):
+    """Broadcast an array of templates (..., notes) to every root: (roots, ..., notes)."""
+    templates = np.asarray(templates)
+    return roots.reshape((-1,) + (1,) * templates.ndim) + templates
+
+
+def inversions(templates):
+    """
+    All inversions of chord templates (qualities, notes) as (qualities, inversions, notes).
+    Inversion k starts on note k, and the notes rotated past the top move up an octave.
+    """
+    templates = np.asarray(templates)
+    size = templates.shape[-1]
+    positions = np.arange(size)[:, None] + np.arange(size)[None, :]  # (inversion, note)
+    return templates[:, positions % size] + 12 * (positions >= size)
+
+
+def mode_templates(scale=SCALE_TEMPLATES["Major"]):
+    """Each mode as eight notes of the parent scale starting on its degree: (modes, notes)."""
+    steps = np.asarray(scale[:-1])
+    two_octaves = np.concatenate((steps, steps + 12, [24]))
+    return two_octaves[np.arange(len(steps))[:, None] + np.arange(len(scale))[None, :]]
+
+
+def generate_scales():
+    notes = transpose(list(SCALE_TEMPLATES.values())).tolist()  # (roots, qualities, notes)
+    return {quality: {root: notes[root][q] for root in range(12)}
+            for q, quality in enumerate(SCALE_TEMPLATES)}
+
+
+def generate_chords(templates):
+    """Triads or Sevenths: {"<key> <quality>": {inversion name: notes}} for every key and quality."""
+    notes = transpose(inversions(list(templates.values()))).tolist()  # (roots, qualities, inversions, notes)
+    return {f"{KEY_NAMES[root]} {quality}": dict(zip(INVERSION_NAMES, notes[root][q]))
+            for root in range(12) for q, quality in enumerate(templates)}
+
+
+def generate_modes():
+    notes = transpose(mode_templates()).tolist()  # (roots, modes, notes)
+    return {KEY_NAMES[root]: dict(zip(MODE_NAMES, notes[root])) for root in range(12)}
+
+
+def generate_shells():
+    roots = np.array([root for _, root in SHELL_KEYS])
+    notes = (SHELL_BASE + transpose(list(SHELL_TEMPLATES.values()), roots)).tolist()  # (keys, qualities, voicings, notes)
+    return {quality: {f"{name} {quality}": dict(enumerate(notes[k][q])) for k, (name, _) in enumerate(SHELL_KEYS)}
+            for q, quality in enumerate(SHELL_TEMPLATES)}
+
+
+def generate_tables():
+    """Every table that is derived from interval templates, keyed like the theory store sections."""
+    return {
+        "Scales": generate_scales(),
+        "Triads": generate_chords(TRIAD_TEMPLATES),
+        "Sevenths": generate_chords(SEVENTH_TEMPLATES),
+        "Modes": generate_modes(),
+        "Shells": generate_shells(),
+    }
+
+
+def generate_theory(base):
+    """
+    Return a complete theory dictionary: the generated tables plus every other section of `base`,
+    in the section order of `base`.
+    """
+    tables = generate_tables()
+    theory = {name: tables.pop(name, None) or base[name] for name in base}
+    theory.update(tables)
+    return theory
+
+
+def load_base(path):
+    """Open the hand-entered sections from a theory store, or from a trusted .pkl file."""
+    if path.endswith(".pkl"):
+        import pickle  # Only for migrating old tables
+
+        with open(path, "rb") as file:
+            return pickle.load(file)
+    store = TheoryStore(path)
+    base = {name: store[name] for name in store}
+    store.close()
+    return base
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "theory.bin"
+    target = sys.argv[2] if len(sys.argv) > 2 else "theory.bin"
+    compile_theory(generate_theory(load_base(source)), target)
+    print(f"Generated {target} from templates and {source}")
@@ -1,27 +1,21 @@
 # theory_handler.py
+from grading import ExerciseGrader, build_exercises
 
-def handle_theory_action(theory_mode, theory_list, shared_data_manager):
+
+def handle_theory_action(theory_mode, theory_list, theory=None, variants=(), root=0):
     """
-    Handle the theory action based on the selected theory mode and list, with access to shared data.
+    Handle the theory action based on the selected theory mode and list.
 
     :param theory_mode: The theory mode selected (e.g., "Notes", "Scales", etc.)
     :param theory_list: The list of theory items selected
-    :param shared_data_manager: The shared data manager instance to access shared data
+    :param theory: The theory tables to build the exercise from
+    :param variants: The hands, inversions or shell voicings selected in the third list
+    :param root: Pitch class of the key to practice, 0 for C
+    :return: An ExerciseGrader for the selection, or None if nothing could be built from it
     """
-    print(f"Handling theory action for {theory_mode}")
-
-    # Example: Print out each item selected
-    for item in theory_list:
-        print(f"Selected: {item}")
-
-    # Example: Access shared data via shared_data_manager
-    shared_data = shared_data_manager.shared_data  # Access the shared data dictionary
-    print(f"Shared data: {shared_data}")
-
-    # Example logic based on the theory_mode
-    if theory_mode == "Scales":
-        return f"Processing scales: {', '.join(theory_list)}"
-    elif theory_mode == "Triads":
-        return f"Processing triads: {', '.join(theory_list)}"
-    else:
-        return "Theory action processed"
+    if theory is None:
+        return None
+    exercises = build_exercises(theory, theory_mode, theory_list, variants, root)
+    if not exercises:
+        return None
+    return ExerciseGrader(exercises)
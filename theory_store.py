@@ -0,0 +1,262 @@
+# theory_store.py
+"""
+Versioned binary storage for the theory tables.
+
+theory.pkl is compiled once into theory.bin with:
+
+    python theory_store.py [theory.pkl] [theory.bin]
+
+theory.bin is memory mapped and each top-level section (Scales, Triads, ...) is only decoded
+the first time it is accessed. Unlike unpickling, decoding can only ever produce dicts, lists,
+ints and strings, so the file is safe to distribute.
+
+File layout (little endian):
+    header   MAGIC, u16 format version, u32 section count
+    index    per section: u16 name length, name (UTF-8), u32 offset, u32 length
+    strings  varint byte length, then every distinct string (UTF-8), separated by NUL bytes
+    payload  one encoded value per section
+
+Every string is stored once in the string table, most used first so that the common ones get
+one byte indices, and values refer to it by index. This keeps theory.bin smaller than theory.pkl,
+but decoding every section still takes a few times longer than unpickling. Values are encoded with a one byte tag, where
+varint is an unsigned LEB128 integer:
+    b'd' varint count, then count key/value pairs
+    b'l' varint count, then count items
+    b'b' varint count, then count bytes: a list of ints from 0 to 255
+    b'i' zigzag encoded varint
+    b's' varint index into the string table
+"""
+from collections import Counter
+from collections.abc import Mapping
+import mmap
+import struct
+import sys
+
+MAGIC = b"JPTHEORY"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sHI")
+_U16 = struct.Struct("<H")
+_INDEX_ENTRY = struct.Struct("<II")
+
+_TAG_DICT, _TAG_LIST, _TAG_BYTES, _TAG_INT, _TAG_STR = b"dlbis"
+
+
+class TheoryStoreError(Exception):
+    """Raised when a theory store file is missing its header or has an unsupported version."""
+
+
+def _encode_varint(number, out):
+    while number > 0x7F:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _decode_varint(buffer, offset):
+    number = shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, offset
+        shift += 7
+
+
+def _count_strings(value, counts):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _count_strings(key, counts)
+            _count_strings(item, counts)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _count_strings(item, counts)
+    elif isinstance(value, str):
+        if "\0" in value:
+            raise ValueError("Cannot store strings containing NUL in a theory store")
+        counts[value] += 1
+
+
+def _encode(value, out, strings):
+    """Append the encoding of value to out. strings maps each string to its table index."""
+    if isinstance(value, dict):
+        out += b"d"
+        _encode_varint(len(value), out)
+        for key, item in value.items():
+            _encode(key, out, strings)
+            _encode(item, out, strings)
+    elif isinstance(value, (list, tuple)):
+        if all(type(item) is int and 0 <= item <= 0xFF for item in value):
+            out += b"b"
+            _encode_varint(len(value), out)
+            out += bytes(value)
+            return
+        out += b"l"
+        _encode_varint(len(value), out)
+        for item in value:
+            _encode(item, out, strings)
+    elif isinstance(value, bool):
+        raise TypeError("Cannot store bool values in a theory store")
+    elif isinstance(value, int):
+        out += b"i"
+        _encode_varint(value << 1 if value >= 0 else (-value << 1) - 1, out)
+    elif isinstance(value, str):
+        out += b"s"
+        _encode_varint(strings[value], out)
+    else:
+        raise TypeError(f"Cannot store {type(value).__name__} values in a theory store")
+
+
+def _decode(buffer, offset, strings):
+    """Decode the value starting at offset. Returns (value, offset just past it)."""
+    # Strings and one byte varints are decoded inline, they make up most of every section
+    tag = buffer[offset]
+    count = buffer[offset + 1]
+    offset += 2
+    if count > 0x7F:
+        count, offset = _decode_varint(buffer, offset - 1)
+    if tag == _TAG_STR:
+        return strings[count], offset
+    if tag == _TAG_BYTES:
+        return list(buffer[offset:offset + count]), offset + count
+    if tag == _TAG_DICT:
+        items = {}
+        for _ in range(count):
+            if buffer[offset] == _TAG_STR and buffer[offset + 1] < 0x80:
+                key = strings[buffer[offset + 1]]
+                offset += 2
+            else:
+                key, offset = _decode(buffer, offset, strings)
+            # Most values are short lists of notes or fingers
+            length = buffer[offset + 1]
+            if buffer[offset] == _TAG_BYTES and length < 0x80:
+                offset += 2
+                items[key] = list(buffer[offset:offset + length])
+                offset += length
+            else:
+                items[key], offset = _decode(buffer, offset, strings)
+        return items, offset
+    if tag == _TAG_LIST:
+        items = []
+        for _ in range(count):
+            item, offset = _decode(buffer, offset, strings)
+            items.append(item)
+        return items, offset
+    if tag == _TAG_INT:
+        return (count >> 1) ^ -(count & 1), offset
+    raise TheoryStoreError(f"Unknown value tag {bytes([tag])!r} at offset {offset - 2}")
+
+
+def compile_theory(theory, path):
+    """Write a theory dictionary (as loaded from theory.pkl) to a theory store file."""
+    names = list(theory)
+    counts = Counter()
+    _count_strings(list(theory.values()), counts)
+    table = [string for string, _ in counts.most_common()]
+    strings = {string: number for number, string in enumerate(table)}
+    payloads = []
+    for name in names:
+        out = bytearray()
+        _encode(theory[name], out, strings)
+        payloads.append(out)
+
+    encoded_table = "\0".join(table).encode("utf-8")
+    string_section = bytearray()
+    _encode_varint(len(encoded_table), string_section)
+    string_section += encoded_table
+
+    index_size = sum(_U16.size + len(name.encode("utf-8")) + _INDEX_ENTRY.size for name in names)
+    offset = _HEADER.size + index_size + len(string_section)
+    header = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(names)))
+    for name, payload in zip(names, payloads):
+        encoded_name = name.encode("utf-8")
+        header += _U16.pack(len(encoded_name)) + encoded_name + _INDEX_ENTRY.pack(offset, len(payload))
+        offset += len(payload)
+
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(string_section)
+        for payload in payloads:
+            file.write(payload)
+
+
+def compile_theory_pickle(pickle_path="theory.pkl", path="theory.bin"):
+    """Compile a trusted theory pickle into a theory store file."""
+    import pickle  # Only needed at build time, keep it off the app's import path
+
+    with open(pickle_path, "rb") as file:
+        compile_theory(pickle.load(file), path)
+
+
+class TheoryStore(Mapping):
+    """
+    Read-only, dict-like view of a theory store file.
+
+    Sections are decoded lazily on first access and cached, so `store["Scales"]` behaves like
+    the corresponding entry of the unpickled theory dictionary.
+    """
+
+    def __init__(self, path="theory.bin"):
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sections = {}
+        self._strings = None  # The string table, split on first access
+        self._index = self._read_index()
+
+    def _read_index(self):
+        if len(self._map) < _HEADER.size:
+            raise TheoryStoreError("File is too short to be a theory store")
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise TheoryStoreError("Not a theory store file")
+        if version != FORMAT_VERSION:
+            raise TheoryStoreError(f"Unsupported theory store version {version}")
+
+        index = {}
+        offset = _HEADER.size
+        for _ in range(count):
+            length = _U16.unpack_from(self._map, offset)[0]
+            offset += _U16.size
+            name = str(self._map[offset:offset + length], "utf-8")
+            offset += length
+            index[name] = _INDEX_ENTRY.unpack_from(self._map, offset)
+            offset += _INDEX_ENTRY.size
+        self._strings_offset = offset
+        return index
+
+    def _read_strings(self):
+        length, offset = _decode_varint(self._map, self._strings_offset)
+        return str(self._map[offset:offset + length], "utf-8").split("\0")
+
+    def __getitem__(self, name):
+        try:
+            return self._sections[name]
+        except KeyError:
+            pass
+        offset, length = self._index[name]
+        if self._strings is None:
+            self._strings = self._read_strings()
+        # Indexing bytes is much faster than indexing the map, so decode from a copy of the section
+        value, end = _decode(self._map[offset:offset + length], 0, self._strings)
+        if end != length:
+            raise TheoryStoreError(f"Section {name!r} is corrupt")
+        self._sections[name] = value
+        return value
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Release the memory map. Sections that were already decoded stay usable."""
+        self._map.close()
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "theory.pkl"
+    target = sys.argv[2] if len(sys.argv) > 2 else "theory.bin"
+    compile_theory_pickle(source, target)
+    print(f"Compiled {source} into {target}")